@@ -0,0 +1,126 @@
+"""Multi-process contention benchmark for the character database.
+
+Starts N reader and M writer processes on one database file and reports
+throughput, operation latency and write-lock wait percentiles:
+
+    python benchmarks/contention_benchmark.py --readers 4 --writers 2 --duration 10
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models.database import Database, DatabaseBusyError
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+def reader(db_path, busy_timeout, duration, results):
+    db = Database(db_path, busy_timeout)
+    character_ids = db.get_character_ids()
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if character_ids and random.random() < 0.8:
+                db.get_character_by_id(random.choice(character_ids))
+            else:
+                db.search_characters(f'name {random.randint(0, 99)}')
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    results.put(('read', latencies, [], errors))
+
+def writer(db_path, busy_timeout, duration, results):
+    db = Database(db_path, busy_timeout)
+    character_ids = db.get_character_ids()
+    latencies = []
+    lock_waits = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if not character_ids or random.random() < 0.5:
+                db.add_character(f'name {random.randint(0, 9999)}', random.randint(1, 100),
+                                 0, 'benchmark', 'written by the benchmark', None)
+            else:
+                db.update_character(random.choice(character_ids), f'name {random.randint(0, 9999)}',
+                                    random.randint(1, 100), 1, 'benchmark', 'updated', None)
+        except DatabaseBusyError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+        lock_waits.append(db.last_lock_wait)
+    results.put(('write', latencies, lock_waits, errors))
+
+def format_ms(values):
+    return ' '.join(f'p{p}={percentile(values, p) * 1000:.2f}ms' for p in (50, 95, 99)) + \
+        f' max={max(values, default=0) * 1000:.2f}ms'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds')
+    parser.add_argument('--characters', type=int, default=10000, help='initial rows')
+    parser.add_argument('--busy-timeout', type=int, default=5000, help='milliseconds')
+    parser.add_argument('--db', help='database file (default: a temporary file)')
+    args = parser.parse_args()
+
+    if args.db:
+        run(args, args.db)
+    else:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            run(args, os.path.join(temp_dir, 'benchmark.db'))
+
+def run(args, db_path):
+    db = Database(db_path, args.busy_timeout)
+    existing = len(db.get_character_ids())
+    if existing < args.characters:
+        with db.write_transaction() as conn:
+            conn.executemany(
+                'INSERT INTO character (chara_name, chara_age, is_oc, chara_creator, chara_info) '
+                'VALUES (?, ?, 0, ?, ?)',
+                [(f'name {i % 100}', i % 100, f'creator {i % 50}', 'benchmark')
+                 for i in range(existing, args.characters)]
+            )
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=reader, args=(db_path, args.busy_timeout,
+                                                              args.duration, results))
+                 for _ in range(args.readers)]
+    processes += [multiprocessing.Process(target=writer, args=(db_path, args.busy_timeout,
+                                                               args.duration, results))
+                  for _ in range(args.writers)]
+    for process in processes:
+        process.start()
+
+    collected = {'read': ([], [], 0), 'write': ([], [], 0)}
+    for _ in processes:
+        kind, latencies, lock_waits, errors = results.get()
+        all_latencies, all_waits, all_errors = collected[kind]
+        collected[kind] = (all_latencies + latencies, all_waits + lock_waits, all_errors + errors)
+    for process in processes:
+        process.join()
+
+    print(f'{args.readers} readers, {args.writers} writers, {args.duration:.0f}s on {db_path}')
+    for kind, (latencies, lock_waits, errors) in collected.items():
+        print(f'{kind:>5}: {len(latencies) / args.duration:9.1f} ops/s  '
+              f'latency {format_ms(latencies)}  errors={errors}')
+        if kind == 'write':
+            print(f'       lock wait {format_ms(lock_waits)}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import sys
+from models import backup, sync
+from models.archive_set import ArchiveSet, get_archive_paths
+from models.database import Database
+from utils.helpers import format_size
+
+def print_progress(copied, total):
+    """Prints backup progress on a single line"""
+    percent = copied * 100 // total if total else 100
+    print(f'\r{percent:3d}% ({copied}/{total} pages)', end='', file=sys.stderr, flush=True)
+
+def print_compression(rows, saved):
+    """Prints the result of compressing info texts"""
+    print(f'Compressed {rows} info texts, saved {format_size(saved)}', file=sys.stderr)
+
+def print_character(character):
+    """Prints the details of a character"""
+    if character is None:
+        print('Character not found', file=sys.stderr)
+        sys.exit(1)
+    (chara_id, name, age, is_oc, creator, info, _,
+     franchise_name, _, image) = character
+    print(f'{name} (ID {chara_id}, {"OC" if is_oc else "canon"})')
+    for label, value in (('Age', age), ('Creator', creator), ('Franchise', franchise_name),
+                         ('Image', format_size(len(image)) if image else None)):
+        if value:
+            print(f'{label}: {value}')
+    if info:
+        print()
+        print(info)
+
+def main():
+    parser = argparse.ArgumentParser(description='Character Explorer database tools')
+    parser.add_argument('--db', help='database file (default: data/characters.db)')
+    parser.add_argument('--pages', type=int, default=256, help='pages copied per backup step')
+    parser.add_argument('--archive', action='append', default=[],
+                        help='extra archive file for search/show (repeatable, '
+                             'CHARACTER_EXPLORER_ARCHIVES is also read)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    backup_parser = commands.add_parser('backup', help='copy the database to a file')
+    backup_parser.add_argument('target')
+
+    snapshot_parser = commands.add_parser('snapshot', help='take a rotating snapshot')
+    snapshot_parser.add_argument('--dir', help='snapshot folder (default: data/backups)')
+    snapshot_parser.add_argument('--keep', type=int, default=7, help='snapshots to keep')
+
+    restore_parser = commands.add_parser('restore', help='restore the database from a backup')
+    restore_parser.add_argument('source')
+
+    list_parser = commands.add_parser('list', help='list snapshots')
+    list_parser.add_argument('--dir', help='snapshot folder (default: data/backups)')
+
+    export_parser = commands.add_parser('export-changes',
+                                        help='write changes since a version to a delta file')
+    export_parser.add_argument('--since', type=int, default=0, help='last exported version')
+    export_parser.add_argument('target')
+
+    apply_parser = commands.add_parser('apply-changes', help='merge a delta file')
+    apply_parser.add_argument('source')
+
+    commands.add_parser('sync-status', help='show the change version of the database')
+
+    commands.add_parser('rebuild-stats', help='recompute the statistics summary tables')
+
+    commands.add_parser('compact', help='free unused space, rewriting the file if needed')
+
+    commands.add_parser('check', help='check the database file for corruption')
+
+    commands.add_parser('compress-info', help='compress long info texts stored uncompressed')
+
+    search_parser = commands.add_parser('search', help='search characters in all archives')
+    search_parser.add_argument('term')
+
+    show_parser = commands.add_parser('show', help='show a character from an archive')
+    show_parser.add_argument('source', help="archive alias as printed by search, e.g. 'main'")
+    show_parser.add_argument('id', type=int)
+
+    args = parser.parse_args()
+    db = Database(args.db)
+    db_path = db.db_path
+    if db.compression_report:
+        print_compression(*db.compression_report)
+
+    if args.command == 'backup':
+        path = backup.backup_database(args.target, db_path, args.pages, print_progress)
+        print(f'\nBackup written to {path}')
+    elif args.command == 'snapshot':
+        path = backup.create_snapshot(db_path, args.dir, args.keep, args.pages, print_progress)
+        print(f'\nSnapshot written to {path}')
+    elif args.command == 'restore':
+        snapshot = backup.restore_database(args.source, db_path, args.pages, print_progress)
+        print(f'\nRestored {db_path} from {args.source}')
+        print(f'The previous database was saved to {snapshot}')
+    elif args.command == 'export-changes':
+        version = sync.export_changes(db, args.since, args.target)
+        print(f'Changes up to version {version} written to {args.target}')
+        print(f'Use --since {version} for the next export')
+    elif args.command == 'apply-changes':
+        applied = sync.apply_changes(db, args.source)
+        print(f"Applied {applied['franchises']} franchise, {applied['characters']} character "
+              f"and {applied['deleted']} delete changes")
+        for remote_name, local_name in applied['conflicts']:
+            print(f"Kept franchise name '{local_name}', the rename to '{remote_name}' "
+                  f"clashes with another franchise", file=sys.stderr)
+    elif args.command == 'sync-status':
+        print(f'Current version: {sync.get_version(db)}')
+    elif args.command == 'rebuild-stats':
+        db.rebuild_statistics()
+        stats = db.get_statistics()
+        print(f"Statistics rebuilt: {stats['oc']} OC and {stats['canon']} canon characters")
+    elif args.command == 'compact':
+        if db.needs_vacuum():
+            print('Rewriting the database file, this needs free disk space as large as '
+                  'the database...', file=sys.stderr)
+        print(f'Reclaimed {format_size(db.compact())}')
+    elif args.command == 'check':
+        problems = db.check_integrity()
+        if problems:
+            print('\n'.join(problems))
+            sys.exit(1)
+        print('ok')
+    elif args.command == 'compress-info':
+        print_compression(*db.compress_info())
+    elif args.command in ('search', 'show'):
+        archives = ArchiveSet(db_path)
+        for path in get_archive_paths() + args.archive:
+            try:
+                archives.attach(path)
+            except ValueError as e:
+                print(f'Skipping archive: {e}', file=sys.stderr)
+        if args.command == 'search':
+            for source, chara_id, name, creator, franchise, *_ in \
+                    archives.search_characters(args.term):
+                print(f"{source}\t{chara_id}\t{name}\t{creator or ''}\t{franchise or ''}")
+        else:
+            print_character(archives.get_character_by_id(args.source, args.id))
+    elif args.command == 'list':
+        for path in backup.list_snapshots(args.dir or backup.get_backup_dir(db_path)):
+            print(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import itertools
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+from utils.profiling import profile_action, current_trace, trace_context
+
+class DatabaseWorker(QObject):
+    """Executes controller calls on the database thread"""
+    succeeded = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+
+    def __init__(self, controller):
+        super().__init__()
+        self.controller = controller
+
+    @pyqtSlot(int, str, object, object)
+    def run(self, request_id, method, args, trace):
+        try:
+            with trace_context(trace), profile_action(f'db.{method}'):
+                result = getattr(self.controller, method)(*args)
+        except Exception as e:
+            self.failed.emit(request_id, e)
+        else:
+            self.succeeded.emit(request_id, result)
+
+class AsyncCharacterController(QObject):
+    """Runs CharacterController calls on a dedicated database thread.
+
+    Database opens a new SQLite connection per call, so the connections of
+    these calls are created, used and closed on the database thread. Other
+    background work opens its own connections on its own threads: the gallery
+    thumbnail pool, the maintenance scheduler, the related-characters loader
+    and the backup worker. Results and errors are delivered to the callbacks
+    on the GUI thread.
+    """
+    busy_changed = pyqtSignal(bool)
+    error = pyqtSignal(object)
+
+    request = pyqtSignal(int, str, object, object)
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.sync_controller = controller
+        self.request_ids = itertools.count(1)
+        self.callbacks = {}
+
+        self.thread = QThread(self)
+        self.worker = DatabaseWorker(controller)
+        self.worker.moveToThread(self.thread)
+        self.request.connect(self.worker.run)
+        self.worker.succeeded.connect(self.handle_result)
+        self.worker.failed.connect(self.handle_error)
+        self.thread.start()
+
+    def call(self, method, *args, on_result=None, on_error=None):
+        """Queues a controller call and returns its request ID.
+
+        The profiling trace of the caller carries over to the call and its callbacks.
+        """
+        request_id = next(self.request_ids)
+        trace = current_trace()
+        self.callbacks[request_id] = (on_result, on_error, trace)
+        if len(self.callbacks) == 1:
+            self.busy_changed.emit(True)
+        self.request.emit(request_id, method, args, trace)
+        return request_id
+
+    def is_busy(self):
+        """Returns True while calls are pending"""
+        return bool(self.callbacks)
+
+    def finish_request(self, request_id):
+        callbacks = self.callbacks.pop(request_id, (None, None, None))
+        if not self.callbacks:
+            self.busy_changed.emit(False)
+        return callbacks
+
+    def handle_result(self, request_id, result):
+        on_result, _, trace = self.finish_request(request_id)
+        if on_result:
+            with trace_context(trace):
+                on_result(result)
+
+    def handle_error(self, request_id, exception):
+        _, on_error, trace = self.finish_request(request_id)
+        if on_error:
+            with trace_context(trace):
+                on_error(exception)
+        else:
+            self.error.emit(exception)
+
+    def shutdown(self):
+        """Stops the database thread after the pending calls"""
+        self.thread.quit()
+        self.thread.wait()
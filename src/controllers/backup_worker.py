@@ -0,0 +1,64 @@
+import os
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
+from models import backup
+
+class BackupWorker(QThread):
+    """Runs a backup, snapshot or restore on its own thread"""
+    progress = pyqtSignal(int, int)
+    succeeded = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, mode, path=None, db_path=None, keep=7, parent=None):
+        super().__init__(parent)
+        self.mode = mode
+        self.path = path
+        self.db_path = db_path
+        self.keep = keep
+
+    def run(self):
+        try:
+            if self.mode == 'backup':
+                result = backup.backup_database(self.path, self.db_path,
+                                                progress=self.progress.emit)
+            elif self.mode == 'snapshot':
+                result = backup.create_snapshot(self.db_path, self.path, self.keep,
+                                                progress=self.progress.emit)
+            elif self.mode == 'restore':
+                # The snapshot of the replaced database
+                result = backup.restore_database(self.path, self.db_path,
+                                                 progress=self.progress.emit)
+            else:
+                raise ValueError(f'Unknown backup mode: {self.mode}')
+            self.succeeded.emit(result)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+class SnapshotScheduler(QObject):
+    """Takes a rotating snapshot at a fixed interval.
+
+    The interval in hours is read from CHARACTER_EXPLORER_SNAPSHOT_HOURS
+    (default 24, 0 disables snapshots).
+    """
+    snapshot_created = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, keep=7, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.keep = keep
+        self.worker = None
+
+        hours = float(os.environ.get('CHARACTER_EXPLORER_SNAPSHOT_HOURS', '24'))
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.take_snapshot)
+        if hours > 0:
+            self.timer.start(int(hours * 3600 * 1000))
+
+    def take_snapshot(self):
+        """Starts a snapshot unless one is already running"""
+        if self.worker and self.worker.isRunning():
+            return
+        self.worker = BackupWorker('snapshot', db_path=self.db_path, keep=self.keep, parent=self)
+        self.worker.succeeded.connect(self.snapshot_created.emit)
+        self.worker.failed.connect(self.failed.emit)
+        self.worker.start()
@@ -1,8 +1,36 @@
+import os
+import threading
 from models.database import Database
+from models.name_index import PrefixNameIndex
+
+try:
+    from models.similarity_index import SimilarityIndex
+except ImportError:  # NumPy and SciPy are optional, related characters need them
+    SimilarityIndex = None
 
 class CharacterController:
     def __init__(self):
         self.db = Database()
+        self.franchise_listeners = []
+        
+        self.similarity_index = None
+        self.similarity_pending = {}
+        self.similarity_lock = threading.Lock()
+        self.name_index = None
+    
+    def add_franchise_listener(self, listener):
+        """Registers a callback(event, franchise_id, franchise_name) for franchise changes"""
+        self.franchise_listeners.append(listener)
+    
+    def remove_franchise_listener(self, listener):
+        """Unregisters a franchise change callback"""
+        if listener in self.franchise_listeners:
+            self.franchise_listeners.remove(listener)
+    
+    def notify_franchise_listeners(self, event, franchise_id, franchise_name=None):
+        """Informs all listeners that a franchise was added, updated or deleted"""
+        for listener in list(self.franchise_listeners):
+            listener(event, franchise_id, franchise_name)
     
     # Character operations
     def add_character(self, chara_name, chara_age, is_oc, chara_creator, 
@@ -10,8 +38,11 @@ class CharacterController:
         """Adds a new character"""
         if not chara_name.strip():
             raise ValueError('Character name cannot be empty!')
-        return self.db.add_character(chara_name, chara_age, is_oc, chara_creator,
-                                     chara_info, franchise_id, character_image)
+        character_id = self.db.add_character(chara_name, chara_age, is_oc, chara_creator,
+                                             chara_info, franchise_id, character_image)
+        self.update_similarity_index(character_id, chara_info)
+        self.update_name_index(character_id, None)
+        return character_id
     
     def get_all_characters(self, sort_by='chara_name'):
         """Returns all characters"""
@@ -21,6 +52,10 @@ class CharacterController:
         """Returns a character by ID"""
         return self.db.get_character_by_id(character_id)
     
+    def get_character_image(self, character_id):
+        """Returns the image of a character"""
+        return self.db.get_character_image(character_id)
+    
     def search_characters(self, search_term):
         """Searches characters"""
         return self.db.search_characters(search_term)
@@ -30,24 +65,183 @@ class CharacterController:
         """Updates a character"""
         if not chara_name.strip():
             raise ValueError('Character name cannot be empty!')
+        old_fields = self.get_name_fields(character_id)
         self.db.update_character(character_id, chara_name, chara_age, is_oc,
                                 chara_creator, chara_info, franchise_id, character_image)
+        self.update_similarity_index(character_id, chara_info)
+        self.update_name_index(character_id, old_fields)
     
     def delete_character(self, character_id):
         """Deletes a character"""
+        old_fields = self.get_name_fields(character_id)
         self.db.delete_character(character_id)
+        self.update_similarity_index(character_id, None, deleted=True)
+        self.update_name_index(character_id, old_fields, deleted=True)
+    
+    # Search suggestions
+    def build_name_index(self):
+        """Loads all character, creator and franchise names for search suggestions"""
+        index = PrefixNameIndex()
+        index.build(self.db.get_name_frequencies())
+        self.name_index = index
+        return len(index)
+    
+    def suggest_names(self, prefix):
+        """Returns the most frequent names starting with prefix"""
+        if self.name_index is None:
+            return []
+        return self.name_index.suggest(prefix)
+    
+    def get_name_fields(self, character_id):
+        """Returns the indexed names of a character before it is changed"""
+        if self.name_index is None:
+            return None
+        return self.db.get_character_name_fields(character_id)
+    
+    def update_name_index(self, character_id, old_fields, deleted=False):
+        """Keeps the search suggestions in sync with a character change"""
+        if self.name_index is None:
+            # Not built yet, the build reads the current names
+            return
+        if old_fields is not None:
+            for name in old_fields:
+                self.name_index.remove(name)
+        if not deleted:
+            for name in self.db.get_character_name_fields(character_id) or ():
+                self.name_index.add(name)
+    
+    def reload_name_index(self):
+        """Rebuilds the search suggestions after the database file was replaced"""
+        if self.name_index is not None:
+            self.build_name_index()
+    
+    # Related characters
+    def get_similarity_index_path(self):
+        """Returns the file the related-characters index is stored in"""
+        return os.path.splitext(self.db.db_path)[0] + '-similarity.npz'
+    
+    def load_similarity_index(self, rebuild=False):
+        """Loads the related-characters index, rebuilding it if it is missing or stale.
+
+        Meant for a background thread. Changes made in the meantime are queued
+        and applied before the index is installed.
+        """
+        if SimilarityIndex is None:
+            return None
+        with self.similarity_lock:
+            if rebuild:
+                self.similarity_index = None
+            pending = dict(self.similarity_pending)
+        
+        index = None if rebuild else self.read_similarity_index(pending)
+        if index is None:
+            index = SimilarityIndex(self.get_similarity_index_path())
+            index.build(self.db.get_character_infos())
+        # The full weighting pass runs here, later changes only weight their own rows
+        index.reweight()
+        
+        with self.similarity_lock:
+            self.apply_similarity_changes(index, self.similarity_pending)
+            self.similarity_pending.clear()
+            self.similarity_index = index
+            if index.dirty:
+                index.save()
+        return index
+    
+    def read_similarity_index(self, pending):
+        """Returns the stored index with pending changes applied, None if it is missing or stale"""
+        index = SimilarityIndex(self.get_similarity_index_path())
+        if not index.load():
+            return None
+        self.apply_similarity_changes(index, pending)
+        if set(index.rows_by_id) != set(self.db.get_character_ids()):
+            return None
+        return index
+    
+    def apply_similarity_changes(self, index, changes):
+        """Applies {chara_id: chara_info or None for deleted} to an index"""
+        for character_id, chara_info in changes.items():
+            if chara_info is None:
+                index.remove(character_id)
+            else:
+                index.update(character_id, chara_info)
+    
+    def update_similarity_index(self, character_id, chara_info, deleted=False):
+        """Keeps the related-characters index in sync with a character change"""
+        with self.similarity_lock:
+            if self.similarity_index is None:
+                # Applied once the index is loaded
+                self.similarity_pending[character_id] = None if deleted else (chara_info or '')
+            elif deleted:
+                self.similarity_index.remove(character_id)
+            else:
+                self.similarity_index.update(character_id, chara_info or '')
+    
+    def save_similarity_index(self):
+        """Writes the related-characters index to disk if it has changes.
+
+        If the index is not loaded yet, the queued changes are applied to the
+        stored file, so they carry over to the next session without a rebuild.
+        """
+        if SimilarityIndex is None:
+            return
+        with self.similarity_lock:
+            if self.similarity_index is not None:
+                if self.similarity_index.dirty:
+                    self.similarity_index.save()
+            elif self.similarity_pending:
+                index = self.read_similarity_index(self.similarity_pending)
+                if index is not None:
+                    index.save()
+                    self.similarity_pending.clear()
+    
+    def get_related_characters(self, character_id, k=10):
+        """Returns up to k (chara_id, chara_name, score) of the most similar characters.
+
+        Empty while the index is still loading.
+        """
+        with self.similarity_lock:
+            if self.similarity_index is None:
+                return []
+            related = self.similarity_index.related(character_id, k)
+        names = self.db.get_character_names(chara_id for chara_id, _ in related)
+        return [(chara_id, names[chara_id], score) for chara_id, score in related
+                if chara_id in names]
+    
+    # Statistics
+    def get_statistics(self):
+        """Returns character counts per franchise, creator and OC status"""
+        return self.db.get_statistics()
+    
+    def rebuild_statistics(self):
+        """Recomputes the statistics from scratch"""
+        self.db.rebuild_statistics()
+        return self.db.get_statistics()
+    
+    # Maintenance
+    def needs_vacuum(self):
+        """Returns True until the database file was rewritten for incremental vacuuming"""
+        return self.db.needs_vacuum()
     
     # Franchise operations
     def add_franchise(self, franchise_name, franchise_info=''):
         """Adds a new franchise"""
         if not franchise_name.strip():
             raise ValueError('Franchise name cannot be empty!')
-        return self.db.add_franchise(franchise_name, franchise_info)
+        franchise_id = self.db.add_franchise(franchise_name, franchise_info)
+        if self.name_index is not None:
+            self.name_index.add(franchise_name)
+        self.notify_franchise_listeners('added', franchise_id, franchise_name)
+        return franchise_id
     
     def get_all_franchises(self):
         """Returns all franchises"""
         return self.db.get_all_franchises()
     
+    def get_franchise_names(self):
+        """Returns (franchise_id, franchise_name) for all franchises"""
+        return self.db.get_franchise_names()
+    
     def get_franchise_by_id(self, franchise_id):
         """Returns a franchise by ID"""
         return self.db.get_franchise_by_id(franchise_id)
@@ -57,7 +251,14 @@ class CharacterController:
         if not franchise_name.strip():
             raise ValueError('Franchise name cannot be empty!')
         self.db.update_franchise(franchise_id, franchise_name, franchise_info)
+        if self.name_index is not None:
+            # A rename moves the counts of all its characters, rare enough to rebuild
+            self.build_name_index()
+        self.notify_franchise_listeners('updated', franchise_id, franchise_name)
     
     def delete_franchise(self, franchise_id):
         """Deletes a franchise"""
         self.db.delete_franchise(franchise_id)
+        if self.name_index is not None:
+            self.build_name_index()
+        self.notify_franchise_listeners('deleted', franchise_id)
@@ -0,0 +1,85 @@
+import threading
+import time
+from PyQt6.QtCore import QObject, QTimer, QThreadPool, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+class MaintenanceScheduler(QObject):
+    """Runs database maintenance in small steps while the user is idle.
+
+    Each step runs on the global thread pool, never on the GUI thread, and
+    is limited to time_budget seconds so it never holds the database for long.
+    At most once per INTEGRITY_INTERVAL seconds a step also runs an integrity
+    check, limited to integrity_budget seconds.
+    """
+    stats_updated = pyqtSignal(dict)
+    compacted = pyqtSignal(int)
+    failed = pyqtSignal(str)
+    # The problems found, empty if there are none, None if the check ran out of time
+    integrity_checked = pyqtSignal(object)
+
+    INTEGRITY_INTERVAL = 24 * 60 * 60
+
+    def __init__(self, db, idle_interval=60000, time_budget=0.2, integrity_budget=2.0,
+                 parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.time_budget = time_budget
+        self.integrity_budget = integrity_budget
+        self.last_integrity_check = None
+        self.lock = threading.Lock()
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setInterval(idle_interval)
+        self.idle_timer.timeout.connect(self.start_step)
+        self.idle_timer.start()
+
+        # Moving the focus and switching to or from the application restart the
+        # idle countdown. Unlike an application-wide event filter, these signals
+        # do not add a Python call to every event Qt processes.
+        app = QApplication.instance()
+        app.focusChanged.connect(self.restart_countdown)
+        app.applicationStateChanged.connect(self.restart_countdown)
+
+    def restart_countdown(self, *args):
+        self.idle_timer.start()
+
+    def start_step(self):
+        """Queues one time-boxed maintenance step"""
+        QThreadPool.globalInstance().start(self.run_step)
+
+    def compact_now(self):
+        """Queues a full compaction, reported through the compacted signal"""
+        QThreadPool.globalInstance().start(self.run_compact)
+
+    def refresh_stats(self):
+        """Queues a storage statistics refresh"""
+        QThreadPool.globalInstance().start(self.run_stats)
+
+    def run_step(self):
+        if not self.lock.acquire(blocking=False):
+            return
+        try:
+            self.db.run_maintenance_step(self.time_budget)
+            self.stats_updated.emit(self.db.get_storage_stats())
+            if self.last_integrity_check is None or \
+                    time.monotonic() - self.last_integrity_check > self.INTEGRITY_INTERVAL:
+                self.last_integrity_check = time.monotonic()
+                self.integrity_checked.emit(self.db.check_integrity(self.integrity_budget))
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.lock.release()
+
+    def run_compact(self):
+        with self.lock:
+            try:
+                self.compacted.emit(self.db.compact())
+                self.stats_updated.emit(self.db.get_storage_stats())
+            except Exception as e:
+                self.failed.emit(str(e))
+
+    def run_stats(self):
+        try:
+            self.stats_updated.emit(self.db.get_storage_stats())
+        except Exception as e:
+            self.failed.emit(str(e))
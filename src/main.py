@@ -1,9 +1,13 @@
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from controllers.character_controller import CharacterController
 from views.main_window import MainWindow
 
 def main():
+    # The related-characters index is rebuilt in worker processes
+    multiprocessing.freeze_support()
+    
     app = QApplication(sys.argv)
     
     # Initialize controller
@@ -0,0 +1,155 @@
+import heapq
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from models.database import decode_text
+
+# SQLite refuses more than 10 attached databases with its default build
+MAX_ATTACHED = 10
+
+CHARACTER_COLUMNS = '''
+    c.chara_id, c.chara_name, c.chara_creator, f.franchise_name,
+    c.chara_age, c.is_oc, c.franchise_id,
+    c.character_image IS NOT NULL AS has_image
+'''
+
+def get_archive_paths():
+    """Returns extra archive files listed in CHARACTER_EXPLORER_ARCHIVES"""
+    value = os.environ.get('CHARACTER_EXPLORER_ARCHIVES', '')
+    return [path for path in value.split(os.pathsep) if path.strip()]
+
+def casefold(text):
+    """Unicode-aware lower-casing, registered as an SQL function so SQL and Python sort alike"""
+    return text.casefold() if text is not None else None
+
+def read_only_uri(path):
+    """Returns a SQLite URI that opens the file read-only"""
+    return Path(path).resolve().as_uri() + '?mode=ro'
+
+class ArchiveSet:
+    """A set of character archives that can be queried together.
+
+    The main database is always present under the alias 'main'. Extra
+    archives are attached with ATTACH DATABASE for queries that span all of
+    them, and searched in parallel on separate read-only connections.
+    """
+    def __init__(self, main_path):
+        self.archives = {'main': main_path}
+
+    def attach(self, path, alias=None):
+        """Adds an archive file and returns the alias its results are tagged with"""
+        if not os.path.isfile(path):
+            raise ValueError(f'Archive not found: {path}')
+        if len(self.archives) > MAX_ATTACHED:
+            raise ValueError(f'At most {MAX_ATTACHED} archives can be attached!')
+
+        for existing_alias, existing_path in self.archives.items():
+            if os.path.abspath(existing_path) == os.path.abspath(path):
+                return existing_alias
+
+        base = re.sub(r'\W', '_', alias or Path(path).stem) or 'archive'
+        if base[0].isdigit():
+            base = f'a_{base}'
+        alias = base
+        suffix = 2
+        while alias.lower() in (name.lower() for name in self.archives) or alias.lower() == 'temp':
+            alias = f'{base}_{suffix}'
+            suffix += 1
+
+        self.archives[alias] = path
+        return alias
+
+    def detach(self, alias):
+        """Removes an archive from the set"""
+        if alias == 'main':
+            raise ValueError('The main database cannot be detached!')
+        self.archives.pop(alias, None)
+
+    def get_archives(self):
+        """Returns (alias, path) for all archives"""
+        return list(self.archives.items())
+
+    def get_connection(self):
+        """Opens a read-only connection with every archive attached"""
+        conn = sqlite3.connect(read_only_uri(self.archives['main']), uri=True)
+        for alias, path in self.archives.items():
+            if alias != 'main':
+                conn.execute(f'ATTACH DATABASE ? AS "{alias}"', (read_only_uri(path),))
+        return conn
+
+    def get_archive_connection(self, alias):
+        """Opens a read-only connection to a single archive"""
+        conn = sqlite3.connect(read_only_uri(self.archives[alias]), uri=True)
+        conn.create_function('decode_text', 1, decode_text, deterministic=True)
+        conn.create_function('casefold', 1, casefold, deterministic=True)
+        return conn
+
+    def get_all_characters(self, sort_by='chara_name'):
+        """Returns (source, *character) for the characters of all archives"""
+        valid_columns = ['chara_name', 'chara_creator', 'franchise_name', 'chara_age']
+        if sort_by not in valid_columns:
+            sort_by = 'chara_name'
+
+        selects = [
+            f'''SELECT '{alias}' AS source, {CHARACTER_COLUMNS}
+                FROM "{alias}".character c
+                LEFT JOIN "{alias}".franchise f ON c.franchise_id = f.franchise_id'''
+            for alias in self.archives
+        ]
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(' UNION ALL '.join(selects) + f' ORDER BY {sort_by}')
+        characters = cursor.fetchall()
+        conn.close()
+        return characters
+
+    def search_archive(self, alias, search_term):
+        """Searches one archive, best matches first"""
+        conn = self.get_archive_connection(alias)
+        cursor = conn.cursor()
+        # rank 0: exact name, 1: name prefix, 2: name substring, 3: creator/franchise
+        cursor.execute(f'''
+            SELECT CASE
+                       WHEN casefold(c.chara_name) = casefold(?) THEN 0
+                       WHEN c.chara_name LIKE ? THEN 1
+                       WHEN c.chara_name LIKE ? THEN 2
+                       ELSE 3
+                   END AS rank, {CHARACTER_COLUMNS}
+            FROM character c
+            LEFT JOIN franchise f ON c.franchise_id = f.franchise_id
+            WHERE c.chara_name LIKE ? OR c.chara_creator LIKE ? OR f.franchise_name LIKE ?
+            ORDER BY rank, casefold(c.chara_name)
+        ''', (search_term, f'{search_term}%', f'%{search_term}%',
+              f'%{search_term}%', f'%{search_term}%', f'%{search_term}%'))
+        results = [(row[0], casefold(row[2]), alias) + row[1:] for row in cursor.fetchall()]
+        conn.close()
+        return results
+
+    def search_characters(self, search_term):
+        """Searches all archives in parallel and merges the results by rank"""
+        with ThreadPoolExecutor(max_workers=len(self.archives)) as executor:
+            per_archive = list(executor.map(
+                lambda alias: self.search_archive(alias, search_term), self.archives))
+
+        # Each archive is already sorted by (rank, name), so a k-way merge is enough
+        merged = heapq.merge(*per_archive, key=lambda row: row[:2])
+        return [row[2:] for row in merged]
+
+    def get_character_by_id(self, source, character_id):
+        """Returns a single character from the given archive"""
+        conn = self.get_archive_connection(source)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT c.chara_id, c.chara_name, c.chara_age, c.is_oc, c.chara_creator,
+                   decode_text(c.chara_info), c.franchise_id, f.franchise_name,
+                   decode_text(f.franchise_info), c.character_image
+            FROM character c
+            LEFT JOIN franchise f ON c.franchise_id = f.franchise_id
+            WHERE c.chara_id = ?
+        ''', (character_id,))
+        character = cursor.fetchone()
+        conn.close()
+        return character
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import time
+from datetime import datetime
+from models.database import Database, get_database_path
+from models.archive_set import read_only_uri
+
+SNAPSHOT_PREFIX = 'characters-'
+SNAPSHOT_SUFFIX = '.db'
+# A file without these tables is not a character archive
+REQUIRED_TABLES = {'character', 'franchise'}
+
+def get_backup_dir(db_path=None):
+    """Returns the folder for rotating snapshots, next to the database"""
+    db_path = db_path or get_database_path()
+    backup_dir = os.path.join(os.path.dirname(os.path.abspath(db_path)), 'backups')
+    os.makedirs(backup_dir, exist_ok=True)
+    return backup_dir
+
+def copy_database(source_path, target_path, pages=256, progress=None, step_delay=0.005):
+    """Copies a live database with the SQLite backup API.
+
+    Only `pages` pages are copied per step and the source is unlocked between
+    steps, so writers are blocked for at most one step. progress is called
+    with (pages_copied, total_pages) after every step.
+    """
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+
+    def on_progress(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+        if step_delay:
+            time.sleep(step_delay)
+
+    try:
+        source.backup(target, pages=pages, progress=on_progress)
+    finally:
+        target.close()
+        source.close()
+
+def check_database(path):
+    """Raises ValueError if the file is not an intact SQLite database"""
+    conn = sqlite3.connect(read_only_uri(path), uri=True)
+    try:
+        result = conn.execute('PRAGMA quick_check').fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f'{path} is not a valid database: {e}')
+    finally:
+        conn.close()
+    if result != 'ok':
+        raise ValueError(f'{path} is damaged: {result}')
+
+def check_schema(path):
+    """Raises ValueError if the file is not a character archive"""
+    conn = sqlite3.connect(read_only_uri(path), uri=True)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    missing = REQUIRED_TABLES - tables
+    if missing:
+        raise ValueError(f"{path} is not a character archive (missing {', '.join(sorted(missing))})")
+
+def backup_database(target_path, db_path=None, pages=256, progress=None):
+    """Writes a consistent copy of the database to target_path"""
+    db_path = db_path or get_database_path()
+    temp_path = target_path + '.part'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    # Copy to a temporary file first, so an interrupted backup never
+    # replaces a good one
+    copy_database(db_path, temp_path, pages, progress)
+    os.replace(temp_path, target_path)
+    return target_path
+
+def restore_database(backup_path, db_path=None, pages=256, progress=None, backup_dir=None):
+    """Replaces the contents of the database with a backup.
+
+    The current database is saved as a snapshot first, so a restore can be
+    undone by restoring that snapshot. Returns the snapshot path. Backups
+    made by older versions are migrated to the current schema.
+    """
+    db_path = db_path or get_database_path()
+    check_database(backup_path)
+    check_schema(backup_path)
+    snapshot_path = create_snapshot(db_path, backup_dir, pages=pages, progress=progress)
+    copy_database(backup_path, db_path, pages, progress)
+    Database(db_path)
+    return snapshot_path
+
+def list_snapshots(backup_dir=None):
+    """Returns the snapshot files, oldest first"""
+    backup_dir = backup_dir or get_backup_dir()
+    snapshots = [
+        os.path.join(backup_dir, name) for name in os.listdir(backup_dir)
+        if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)
+    ]
+    return sorted(snapshots)
+
+def rotate_snapshots(backup_dir=None, keep=7):
+    """Deletes all but the newest `keep` snapshots"""
+    snapshots = list_snapshots(backup_dir)
+    removed = snapshots[:-keep] if keep > 0 else snapshots
+    for path in removed:
+        os.remove(path)
+    return removed
+
+def create_snapshot(db_path=None, backup_dir=None, keep=7, pages=256, progress=None):
+    """Writes a timestamped snapshot and deletes the oldest ones"""
+    backup_dir = backup_dir or get_backup_dir(db_path)
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    target_path = os.path.join(backup_dir, f'{SNAPSHOT_PREFIX}{timestamp}{SNAPSHOT_SUFFIX}')
+
+    backup_database(target_path, db_path, pages, progress)
+    rotate_snapshots(backup_dir, keep)
+    return target_path
@@ -1,6 +1,10 @@
 import sqlite3
 import os
 import sys
+import time
+import random
+import zlib
+from contextlib import contextmanager
 
 def get_database_path():
     """Returns the correct path for the database (also for .exe)"""
@@ -13,22 +17,135 @@ def get_database_path():
     os.makedirs(data_dir, exist_ok=True)
     return os.path.join(data_dir, 'characters.db')
 
+# Info texts longer than this many bytes are stored zlib-compressed
+COMPRESS_THRESHOLD = 1024
+
+def encode_text(text):
+    """Returns the stored form of an info text.
+
+    Long texts become a zlib BLOB, everything else stays TEXT, so the
+    column type tells both forms apart.
+    """
+    if text is None or isinstance(text, bytes):
+        return text
+    data = text.encode('utf-8')
+    if len(data) <= COMPRESS_THRESHOLD:
+        return text
+    compressed = zlib.compress(data, 6)
+    return compressed if len(compressed) < len(data) else text
+
+def execute_statements(conn, script):
+    """Runs a multi-statement script inside the current transaction.
+
+    Unlike executescript(), this does not commit before running.
+    """
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ''
+    if statement.strip():
+        raise ValueError(f'Incomplete SQL statement: {statement.strip()}')
+
+def decode_text(value):
+    """Returns the plain text of a stored info text"""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode('utf-8')
+    return value
+
+class DatabaseBusyError(Exception):
+    """Raised when another program keeps the database locked for too long"""
+
 class Database:
-    def __init__(self):
-        self.db_path = get_database_path()
+    # Schema migrations, applied in order and tracked with PRAGMA user_version
+    MIGRATIONS = [
+        'migrate_incremental_vacuum',
+        'migrate_change_tracking',
+        'migrate_statistics',
+        'migrate_compressed_info',
+    ]
+    
+    # Tables whose changes are tracked for syncing: (primary key, data columns)
+    TRACKED_TABLES = {
+        'franchise': ('franchise_id', ['franchise_name', 'franchise_info']),
+        'character': ('chara_id', ['chara_name', 'chara_age', 'is_oc', 'chara_creator',
+                                   'chara_info', 'franchise_id', 'character_image']),
+    }
+    
+    # Retries of BEGIN IMMEDIATE after the busy timeout ran out
+    WRITE_RETRIES = 5
+    
+    def __init__(self, db_path=None, busy_timeout=None):
+        self.db_path = db_path or get_database_path()
+        # Milliseconds a statement waits for a lock held by another connection,
+        # also the total wait for the write lock in write_transaction()
+        self.busy_timeout = busy_timeout if busy_timeout is not None else \
+            int(os.environ.get('CHARACTER_EXPLORER_BUSY_TIMEOUT', '5000'))
+        self.last_lock_wait = 0.0
+        # (rows, bytes saved) if this run compressed existing info texts
+        self.compression_report = None
         self.create_tables()
+        self.migrate()
     
     def get_connection(self):
         """Creates a new database connection with foreign key support"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout / 1000)
         conn.execute("PRAGMA foreign_keys = ON")
+        conn.create_function('decode_text', 1, decode_text, deterministic=True)
         return conn
     
+    @contextmanager
+    def write_transaction(self):
+        """Yields a connection inside a BEGIN IMMEDIATE transaction.
+
+        The write lock is taken up front, so statements inside never fail with
+        'database is locked'. busy_timeout is the total time spent waiting for
+        the lock: it is split across the first attempt and WRITE_RETRIES
+        retries with jittered exponential backoff, after which
+        DatabaseBusyError is raised. The transaction commits on success and
+        rolls back on error.
+        """
+        conn = self.get_connection()
+        conn.isolation_level = None
+        started = time.perf_counter()
+        deadline = started + self.busy_timeout / 1000
+        conn.execute(f'PRAGMA busy_timeout = {self.busy_timeout // (self.WRITE_RETRIES + 1)}')
+        try:
+            for attempt in range(self.WRITE_RETRIES + 1):
+                try:
+                    conn.execute('BEGIN IMMEDIATE')
+                    break
+                except sqlite3.OperationalError as e:
+                    if 'locked' not in str(e) and 'busy' not in str(e):
+                        raise
+                    delay = random.uniform(0, 0.05 * 2 ** attempt)
+                    if attempt == self.WRITE_RETRIES or time.perf_counter() + delay >= deadline:
+                        raise DatabaseBusyError(
+                            'The database is locked by another program, please try again.'
+                        ) from e
+                    time.sleep(delay)
+            self.last_lock_wait = time.perf_counter() - started
+            
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+    
     def create_tables(self):
         """Creates the franchise and character tables"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # Only takes effect on a new, empty database file
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        # Readers and the writer don't block each other, the setting is persistent
+        cursor.execute('PRAGMA journal_mode = WAL')
+        
         # Franchise table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS franchise (
@@ -56,33 +173,412 @@ class Database:
         conn.commit()
         conn.close()
     
+    def migrate(self):
+        """Applies all pending schema migrations.
+
+        Each migration runs in one transaction together with its user_version
+        bump, so an interrupted migration is rolled back and simply retried.
+        """
+        conn = self.get_connection()
+        conn.isolation_level = None
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        
+        try:
+            for target, migration in enumerate(self.MIGRATIONS, start=1):
+                if version >= target:
+                    continue
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    # Another process may have migrated in the meantime
+                    if conn.execute('PRAGMA user_version').fetchone()[0] < target:
+                        getattr(self, migration)(conn)
+                        conn.execute(f'PRAGMA user_version = {target}')
+                    conn.execute('COMMIT')
+                except BaseException:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                    raise
+        finally:
+            conn.close()
+    
+    def migrate_incremental_vacuum(self, conn):
+        """Switches existing databases to auto_vacuum=INCREMENTAL.
+
+        On a populated file the setting only takes effect with the next full
+        VACUUM, which compact() runs on request instead of blocking startup.
+        """
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    
+    def migrate_change_tracking(self, conn):
+        """Adds row versions, sync IDs and tombstones, maintained by triggers.
+
+        The sync metadata lives in the sync_row side table, so tracking a change
+        never rewrites the row and its image. Images get their own version, so
+        deltas only carry them when they changed.
+        """
+        now = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+        next_version = "(SELECT value FROM sync_state WHERE key = 'version')"
+        bump_version = "UPDATE sync_state SET value = value + 1 WHERE key = 'version';"
+        new_sync_id = 'lower(hex(randomblob(16)))'
+        
+        execute_statements(conn, f'''
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value NOT NULL
+            );
+            INSERT OR IGNORE INTO sync_state VALUES ('version', 1);
+            INSERT OR IGNORE INTO sync_state VALUES ('database_id', {new_sync_id});
+            
+            CREATE TABLE IF NOT EXISTS sync_row (
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                sync_id TEXT NOT NULL,
+                row_version INTEGER NOT NULL,
+                updated_at TEXT NOT NULL,
+                image_version INTEGER NOT NULL,
+                PRIMARY KEY (table_name, row_id),
+                UNIQUE (table_name, sync_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_sync_row_version ON sync_row(table_name, row_version);
+            
+            CREATE TABLE IF NOT EXISTS tombstone (
+                table_name TEXT NOT NULL,
+                sync_id TEXT NOT NULL,
+                row_version INTEGER NOT NULL,
+                deleted_at TEXT NOT NULL,
+                PRIMARY KEY (table_name, sync_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_tombstone_version ON tombstone(row_version);
+        ''')
+        
+        for table, (key, columns) in self.TRACKED_TABLES.items():
+            execute_statements(conn, f'''
+                INSERT OR IGNORE INTO sync_row
+                SELECT '{table}', {key}, {new_sync_id}, 1, {now}, 1 FROM {table};
+                
+                CREATE TRIGGER {table}_track_insert AFTER INSERT ON {table}
+                BEGIN
+                    {bump_version}
+                    INSERT OR REPLACE INTO sync_row
+                    VALUES ('{table}', NEW.{key}, {new_sync_id}, {next_version}, {now}, {next_version});
+                END;
+                
+                CREATE TRIGGER {table}_track_update AFTER UPDATE OF {', '.join(columns)} ON {table}
+                BEGIN
+                    {bump_version}
+                    UPDATE sync_row SET row_version = {next_version}, updated_at = {now}
+                    WHERE table_name = '{table}' AND row_id = NEW.{key};
+                END;
+                
+                CREATE TRIGGER {table}_track_delete AFTER DELETE ON {table}
+                BEGIN
+                    {bump_version}
+                    INSERT OR REPLACE INTO tombstone (table_name, sync_id, row_version, deleted_at)
+                    SELECT '{table}', sync_id, {next_version}, {now} FROM sync_row
+                    WHERE table_name = '{table}' AND row_id = OLD.{key};
+                    DELETE FROM sync_row WHERE table_name = '{table}' AND row_id = OLD.{key};
+                END;
+            ''')
+        
+        execute_statements(conn, f'''
+            CREATE TRIGGER character_track_image AFTER UPDATE OF character_image ON character
+            WHEN OLD.character_image IS NOT NEW.character_image
+            BEGIN
+                {bump_version}
+                UPDATE sync_row SET image_version = {next_version}
+                WHERE table_name = 'character' AND row_id = NEW.chara_id;
+            END;
+        ''')
+    
+    def migrate_statistics(self, conn):
+        """Adds summary tables that triggers keep up to date"""
+        # Characters without franchise are counted under franchise_id 0,
+        # characters without creator under ''
+        add_new = '''
+            INSERT INTO stats_franchise VALUES
+                (COALESCE(NEW.franchise_id, 0), 1, COALESCE(length(NEW.character_image), 0))
+            ON CONFLICT (franchise_id) DO UPDATE
+                SET character_count = character_count + 1,
+                    image_bytes = image_bytes + excluded.image_bytes;
+            INSERT INTO stats_creator VALUES (COALESCE(NEW.chara_creator, ''), 1)
+            ON CONFLICT (chara_creator) DO UPDATE SET character_count = character_count + 1;
+            UPDATE stats_totals SET value = value + 1
+            WHERE key = CASE WHEN NEW.is_oc THEN 'oc' ELSE 'canon' END;
+        '''
+        remove_old = '''
+            UPDATE stats_franchise
+            SET character_count = character_count - 1,
+                image_bytes = image_bytes - COALESCE(length(OLD.character_image), 0)
+            WHERE franchise_id = COALESCE(OLD.franchise_id, 0);
+            DELETE FROM stats_franchise
+            WHERE franchise_id = COALESCE(OLD.franchise_id, 0) AND character_count <= 0;
+            UPDATE stats_creator SET character_count = character_count - 1
+            WHERE chara_creator = COALESCE(OLD.chara_creator, '');
+            DELETE FROM stats_creator
+            WHERE chara_creator = COALESCE(OLD.chara_creator, '') AND character_count <= 0;
+            UPDATE stats_totals SET value = value - 1
+            WHERE key = CASE WHEN OLD.is_oc THEN 'oc' ELSE 'canon' END;
+        '''
+        
+        execute_statements(conn, f'''
+            CREATE TABLE stats_franchise (
+                franchise_id INTEGER PRIMARY KEY,
+                character_count INTEGER NOT NULL,
+                image_bytes INTEGER NOT NULL
+            );
+            CREATE TABLE stats_creator (
+                chara_creator TEXT PRIMARY KEY,
+                character_count INTEGER NOT NULL
+            );
+            CREATE TABLE stats_totals (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            
+            CREATE TRIGGER stats_character_insert AFTER INSERT ON character
+            BEGIN
+                {add_new}
+            END;
+            
+            CREATE TRIGGER stats_character_update
+            AFTER UPDATE OF franchise_id, chara_creator, is_oc, character_image ON character
+            BEGIN
+                {remove_old}
+                {add_new}
+            END;
+            
+            CREATE TRIGGER stats_character_delete AFTER DELETE ON character
+            BEGIN
+                {remove_old}
+            END;
+        ''')
+        self.rebuild_statistics(conn)
+    
+    def migrate_compressed_info(self, conn):
+        """Compresses the existing long info texts"""
+        rows, saved = self.compress_info(conn)
+        if rows:
+            self.compression_report = (rows, saved)
+    
+    def compress_info(self, conn=None):
+        """Stores long chara_info and franchise_info texts compressed.
+
+        Returns the number of rewritten rows and the bytes saved.
+        """
+        if conn is None:
+            with self.write_transaction() as conn:
+                return self.compress_info(conn)
+        
+        rows = saved = 0
+        for table, key, column in (('character', 'chara_id', 'chara_info'),
+                                   ('franchise', 'franchise_id', 'franchise_info')):
+            candidates = conn.execute(f'''
+                SELECT t.{key}, t.{column}, s.row_version, s.updated_at
+                FROM {table} t
+                JOIN sync_row s ON s.table_name = '{table}' AND s.row_id = t.{key}
+                WHERE typeof(t.{column}) = 'text' AND length(CAST(t.{column} AS BLOB)) > ?
+            ''', (COMPRESS_THRESHOLD,)).fetchall()
+            for row_id, text, row_version, updated_at in candidates:
+                stored = encode_text(text)
+                if isinstance(stored, bytes):
+                    conn.execute(f'UPDATE {table} SET {column} = ? WHERE {key} = ?',
+                                 (stored, row_id))
+                    # Only the encoding changed, so the row is not a change to sync
+                    conn.execute('''
+                        UPDATE sync_row SET row_version = ?, updated_at = ?
+                        WHERE table_name = ? AND row_id = ?
+                    ''', (row_version, updated_at, table, row_id))
+                    rows += 1
+                    saved += len(text.encode('utf-8')) - len(stored)
+        return rows, saved
+    
+    # Statistics operations
+    def rebuild_statistics(self, conn=None):
+        """Recomputes the summary tables, inside the caller's transaction if conn is given"""
+        if conn is None:
+            with self.write_transaction() as conn:
+                self.fill_statistics(conn)
+        else:
+            self.fill_statistics(conn)
+    
+    def fill_statistics(self, conn):
+        """Replaces the contents of the summary tables"""
+        conn.execute('DELETE FROM stats_franchise')
+        conn.execute('DELETE FROM stats_creator')
+        conn.execute('DELETE FROM stats_totals')
+        conn.execute('''
+            INSERT INTO stats_franchise
+            SELECT COALESCE(franchise_id, 0), COUNT(*), COALESCE(SUM(length(character_image)), 0)
+            FROM character GROUP BY COALESCE(franchise_id, 0)
+        ''')
+        conn.execute('''
+            INSERT INTO stats_creator
+            SELECT COALESCE(chara_creator, ''), COUNT(*)
+            FROM character GROUP BY COALESCE(chara_creator, '')
+        ''')
+        conn.execute('''
+            INSERT INTO stats_totals
+            SELECT 'oc', COUNT(*) FROM character WHERE is_oc
+            UNION ALL
+            SELECT 'canon', COUNT(*) FROM character WHERE NOT is_oc
+        ''')
+    
+    def get_statistics(self):
+        """Returns the archive statistics from the summary tables"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT key, value FROM stats_totals')
+        totals = dict(cursor.fetchall())
+        
+        cursor.execute('''
+            SELECT f.franchise_name, s.character_count, s.image_bytes
+            FROM stats_franchise s
+            LEFT JOIN franchise f ON s.franchise_id = f.franchise_id
+            ORDER BY s.character_count DESC
+        ''')
+        franchises = cursor.fetchall()
+        
+        cursor.execute('''
+            SELECT chara_creator, character_count FROM stats_creator
+            ORDER BY character_count DESC
+        ''')
+        creators = cursor.fetchall()
+        conn.close()
+        
+        return {
+            'oc': totals.get('oc', 0),
+            'canon': totals.get('canon', 0),
+            'franchises': franchises,
+            'creators': creators,
+        }
+    
+    # Maintenance operations
+    def get_storage_stats(self):
+        """Returns file size, page counts and the free-page ratio"""
+        conn = self.get_connection()
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        freelist_count = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.close()
+        
+        return {
+            'file_size': os.path.getsize(self.db_path),
+            'page_size': page_size,
+            'page_count': page_count,
+            'freelist_count': freelist_count,
+            'free_ratio': freelist_count / page_count if page_count else 0.0,
+            'needs_vacuum': self.needs_vacuum(),
+        }
+    
+    def needs_vacuum(self):
+        """Returns True until a full VACUUM has switched the file to incremental vacuuming"""
+        conn = self.get_connection()
+        mode = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+        conn.close()
+        return mode != 2
+    
+    def run_maintenance_step(self, time_budget=0.2, pages_per_step=64):
+        """Refreshes planner statistics and frees unused pages for at most time_budget seconds"""
+        deadline = time.monotonic() + time_budget
+        conn = self.get_connection()
+        # Samples this many rows per index, so ANALYZE stays short on big tables
+        conn.execute('PRAGMA analysis_limit = 400')
+        
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).fetchone()
+        conn.execute('PRAGMA optimize' if has_stats else 'ANALYZE')
+        conn.commit()
+        
+        pages_freed = 0
+        while time.monotonic() < deadline:
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if not free_pages:
+                break
+            # executescript steps the pragma to completion, execute() frees only one page
+            conn.executescript(f'PRAGMA incremental_vacuum({pages_per_step});')
+            pages_freed += min(free_pages, pages_per_step)
+        
+        conn.close()
+        return pages_freed
+    
+    def check_integrity(self, time_budget=None):
+        """Runs PRAGMA quick_check, giving up after time_budget seconds.
+
+        Returns the list of problems found, empty if the file is fine, or None
+        if the check ran out of time.
+        """
+        conn = self.get_connection()
+        if time_budget is not None:
+            deadline = time.monotonic() + time_budget
+            conn.set_progress_handler(lambda: time.monotonic() > deadline, 100)
+        try:
+            rows = conn.execute('PRAGMA quick_check').fetchall()
+        except sqlite3.OperationalError as e:
+            if 'interrupted' not in str(e):
+                raise
+            return None
+        finally:
+            conn.close()
+        return [] if rows == [('ok',)] else [row[0] for row in rows]
+    
+    def compact(self):
+        """Frees all unused pages at once and returns the number of bytes reclaimed.
+
+        If the file still needs the switch to incremental vacuuming, a full
+        VACUUM rewrites it, which needs free disk space as large as the file.
+        """
+        size_before = os.path.getsize(self.db_path)
+        conn = self.get_connection()
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+        else:
+            conn.executescript('PRAGMA incremental_vacuum;')
+        conn.close()
+        return size_before - os.path.getsize(self.db_path)
+    
     # Franchise operations
     def add_franchise(self, franchise_name, franchise_info=''):
         """Adds a new franchise"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute('''
-                INSERT INTO franchise (franchise_name, franchise_info)
-                VALUES (?, ?)
-            ''', (franchise_name, franchise_info))
-            conn.commit()
-            franchise_id = cursor.lastrowid
+            with self.write_transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO franchise (franchise_name, franchise_info)
+                    VALUES (?, ?)
+                ''', (franchise_name, encode_text(franchise_info)))
+                franchise_id = cursor.lastrowid
             return franchise_id
         except sqlite3.IntegrityError:
             # Franchise already exists, return its ID
+            conn = self.get_connection()
+            cursor = conn.cursor()
             cursor.execute('SELECT franchise_id FROM franchise WHERE franchise_name = ?', 
                          (franchise_name,))
             result = cursor.fetchone()
-            return result[0] if result else None
-        finally:
             conn.close()
+            return result[0] if result else None
     
     def get_all_franchises(self):
         """Returns all franchises"""
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM franchise ORDER BY franchise_name')
+        cursor.execute('''
+            SELECT franchise_id, franchise_name, decode_text(franchise_info)
+            FROM franchise ORDER BY franchise_name
+        ''')
+        franchises = cursor.fetchall()
+        conn.close()
+        return franchises
+    
+    def get_franchise_names(self):
+        """Returns (franchise_id, franchise_name) for all franchises, without the info text"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT franchise_id, franchise_name FROM franchise ORDER BY franchise_name')
         franchises = cursor.fetchall()
         conn.close()
         return franchises
@@ -91,49 +587,45 @@ class Database:
         """Returns a single franchise by ID"""
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM franchise WHERE franchise_id = ?', (franchise_id,))
+        cursor.execute('''
+            SELECT franchise_id, franchise_name, decode_text(franchise_info)
+            FROM franchise WHERE franchise_id = ?
+        ''', (franchise_id,))
         franchise = cursor.fetchone()
         conn.close()
         return franchise
     
     def update_franchise(self, franchise_id, franchise_name, franchise_info):
         """Updates a franchise"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE franchise 
-            SET franchise_name = ?, franchise_info = ?
-            WHERE franchise_id = ?
-        ''', (franchise_name, franchise_info, franchise_id))
-        conn.commit()
-        conn.close()
+        with self.write_transaction() as conn:
+            conn.execute('''
+                UPDATE franchise 
+                SET franchise_name = ?, franchise_info = ?
+                WHERE franchise_id = ?
+            ''', (franchise_name, encode_text(franchise_info), franchise_id))
     
     def delete_franchise(self, franchise_id):
         """Deletes a franchise"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM franchise WHERE franchise_id = ?', (franchise_id,))
-        conn.commit()
-        conn.close()
+        with self.write_transaction() as conn:
+            conn.execute('DELETE FROM franchise WHERE franchise_id = ?', (franchise_id,))
     
     # Character operations
     def add_character(self, chara_name, chara_age, is_oc, chara_creator, 
                      chara_info, franchise_id, character_image=None):
         """Adds a new character"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO character 
-            (chara_name, chara_age, is_oc, chara_creator, chara_info, franchise_id, character_image)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (chara_name, chara_age, is_oc, chara_creator, chara_info, franchise_id, character_image))
-        conn.commit()
-        character_id = cursor.lastrowid
-        conn.close()
+        with self.write_transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO character 
+                (chara_name, chara_age, is_oc, chara_creator, chara_info, franchise_id, character_image)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (chara_name, chara_age, is_oc, chara_creator, encode_text(chara_info),
+                  franchise_id, character_image))
+            character_id = cursor.lastrowid
         return character_id
     
     def get_all_characters(self, sort_by='chara_name'):
-        """Returns all characters with franchise info"""
+        """Returns all characters with franchise names, without info texts and images"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -143,7 +635,7 @@ class Database:
         
         cursor.execute(f'''
             SELECT c.chara_id, c.chara_name, c.chara_creator, f.franchise_name, 
-                   c.chara_age, c.is_oc, c.chara_info, c.franchise_id, c.character_image
+                   c.chara_age, c.is_oc, c.franchise_id, c.character_image IS NOT NULL AS has_image
             FROM character c
             LEFT JOIN franchise f ON c.franchise_id = f.franchise_id
             ORDER BY {sort_by}
@@ -158,8 +650,8 @@ class Database:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT c.chara_id, c.chara_name, c.chara_age, c.is_oc, c.chara_creator,
-                   c.chara_info, c.franchise_id, f.franchise_name, f.franchise_info, 
-                   c.character_image
+                   decode_text(c.chara_info), c.franchise_id, f.franchise_name,
+                   decode_text(f.franchise_info), c.character_image
             FROM character c
             LEFT JOIN franchise f ON c.franchise_id = f.franchise_id
             WHERE c.chara_id = ?
@@ -168,13 +660,85 @@ class Database:
         conn.close()
         return character
     
+    def get_character_image(self, character_id):
+        """Returns the image of a single character, or None"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT character_image FROM character WHERE chara_id = ?', (character_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+    
+    def get_character_ids(self):
+        """Returns the IDs of all characters"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT chara_id FROM character')
+        character_ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return character_ids
+    
+    def get_character_infos(self):
+        """Returns (chara_id, chara_info) for all characters"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT chara_id, decode_text(chara_info) FROM character')
+        infos = cursor.fetchall()
+        conn.close()
+        return infos
+    
+    def get_character_names(self, character_ids):
+        """Returns a {chara_id: chara_name} dict for the given IDs"""
+        character_ids = list(character_ids)
+        if not character_ids:
+            return {}
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        placeholders = ', '.join('?' * len(character_ids))
+        cursor.execute(f'SELECT chara_id, chara_name FROM character WHERE chara_id IN ({placeholders})',
+                       character_ids)
+        names = dict(cursor.fetchall())
+        conn.close()
+        return names
+    
+    def get_name_frequencies(self):
+        """Returns (name, count) for all character, creator and franchise names"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT chara_name, COUNT(*) FROM character GROUP BY chara_name
+            UNION ALL
+            SELECT chara_creator, character_count FROM stats_creator
+            UNION ALL
+            SELECT f.franchise_name, COALESCE(s.character_count, 0) + 1
+            FROM franchise f
+            LEFT JOIN stats_franchise s ON f.franchise_id = s.franchise_id
+        ''')
+        names = cursor.fetchall()
+        conn.close()
+        return names
+    
+    def get_character_name_fields(self, character_id):
+        """Returns (chara_name, chara_creator, franchise_name) of a character"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT c.chara_name, c.chara_creator, f.franchise_name
+            FROM character c
+            LEFT JOIN franchise f ON c.franchise_id = f.franchise_id
+            WHERE c.chara_id = ?
+        ''', (character_id,))
+        fields = cursor.fetchone()
+        conn.close()
+        return fields
+    
     def search_characters(self, search_term):
-        """Searches characters by name, creator, or franchise"""
+        """Searches characters by name, creator, or franchise, without info texts and images"""
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('''
             SELECT c.chara_id, c.chara_name, c.chara_creator, f.franchise_name,
-                   c.chara_age, c.is_oc, c.chara_info, c.franchise_id, c.character_image
+                   c.chara_age, c.is_oc, c.franchise_id, c.character_image IS NOT NULL AS has_image
             FROM character c
             LEFT JOIN franchise f ON c.franchise_id = f.franchise_id
             WHERE c.chara_name LIKE ? OR c.chara_creator LIKE ? OR f.franchise_name LIKE ?
@@ -186,33 +750,28 @@ class Database:
     def update_character(self, character_id, chara_name, chara_age, is_oc, 
                         chara_creator, chara_info, franchise_id, character_image=None):
         """Updates a character"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        chara_info = encode_text(chara_info)
+        with self.write_transaction() as conn:
+            cursor = conn.cursor()
         
-        if character_image is not None:
-            cursor.execute('''
-                UPDATE character 
-                SET chara_name = ?, chara_age = ?, is_oc = ?, chara_creator = ?,
-                    chara_info = ?, franchise_id = ?, character_image = ?
-                WHERE chara_id = ?
-            ''', (chara_name, chara_age, is_oc, chara_creator, chara_info, 
-                 franchise_id, character_image, character_id))
-        else:
-            cursor.execute('''
-                UPDATE character 
-                SET chara_name = ?, chara_age = ?, is_oc = ?, chara_creator = ?,
-                    chara_info = ?, franchise_id = ?
-                WHERE chara_id = ?
-            ''', (chara_name, chara_age, is_oc, chara_creator, chara_info, 
-                 franchise_id, character_id))
-        
-        conn.commit()
-        conn.close()
+            if character_image is not None:
+                cursor.execute('''
+                    UPDATE character 
+                    SET chara_name = ?, chara_age = ?, is_oc = ?, chara_creator = ?,
+                        chara_info = ?, franchise_id = ?, character_image = ?
+                    WHERE chara_id = ?
+                ''', (chara_name, chara_age, is_oc, chara_creator, chara_info, 
+                     franchise_id, character_image, character_id))
+            else:
+                cursor.execute('''
+                    UPDATE character 
+                    SET chara_name = ?, chara_age = ?, is_oc = ?, chara_creator = ?,
+                        chara_info = ?, franchise_id = ?
+                    WHERE chara_id = ?
+                ''', (chara_name, chara_age, is_oc, chara_creator, chara_info, 
+                     franchise_id, character_id))
     
     def delete_character(self, character_id):
         """Deletes a character"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM character WHERE chara_id = ?', (character_id,))
-        conn.commit()
-        conn.close()
+        with self.write_transaction() as conn:
+            conn.execute('DELETE FROM character WHERE chara_id = ?', (character_id,))
@@ -0,0 +1,158 @@
+import bisect
+import heapq
+import threading
+
+class PrefixNameIndex:
+    """Sorted in-memory index of names for prefix suggestions.
+
+    Names are kept in parallel lists sorted by their casefolded key, so all
+    names with a prefix form one contiguous range found by binary search.
+    Suggestions are ranked by frequency. For every prefix whose range holds
+    more than SCAN_LIMIT names, the best names are precomputed, so a lookup
+    never scans more than a few hundred entries.
+    """
+    SCAN_LIMIT = 64
+
+    def __init__(self, limit=10):
+        self.limit = limit
+        self.keys = []
+        self.names = []
+        self.counts = []
+        self.top = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def build(self, name_counts):
+        """Replaces the index with (name, count) pairs"""
+        totals = {}
+        for name, count in name_counts:
+            if name and name.strip():
+                key = name.casefold()
+                display_name, total = totals.get(key, (name, 0))
+                totals[key] = (display_name, total + count)
+
+        entries = sorted((key, name, count) for key, (name, count) in totals.items())
+        with self.lock:
+            self.keys = [entry[0] for entry in entries]
+            self.names = [entry[1] for entry in entries]
+            self.counts = [entry[2] for entry in entries]
+            self.top = {}
+            self.collect('', 0, len(self.keys))
+
+    def find(self, key):
+        """Returns the position of a key, or None"""
+        pos = bisect.bisect_left(self.keys, key)
+        if pos < len(self.keys) and self.keys[pos] == key:
+            return pos
+        return None
+
+    def prefix_range(self, prefix, start=0, end=None):
+        """Returns the (start, end) positions of all keys starting with prefix"""
+        end = len(self.keys) if end is None else end
+        start = bisect.bisect_left(self.keys, prefix, start, end)
+        end = bisect.bisect_left(self.keys, prefix + '\U0010ffff', start, end)
+        return start, end
+
+    def rank_range(self, start, end):
+        """Returns the best (-count, key) entries of a range by scanning it"""
+        return heapq.nsmallest(self.limit, ((-self.counts[pos], self.keys[pos])
+                                            for pos in range(start, end)))
+
+    def children(self, prefix, start, end):
+        """Yields (child_prefix, start, end) for the keys one character longer than prefix"""
+        depth = len(prefix)
+        pos = start
+        while pos < end:
+            child = prefix + self.keys[pos][depth]
+            child_end = self.prefix_range(child, pos, end)[1]
+            yield child, pos, child_end
+            pos = child_end
+
+    def collect(self, prefix, start, end):
+        """Returns the best entries of a range, storing them for every large prefix below it"""
+        if end - start <= self.SCAN_LIMIT:
+            return self.rank_range(start, end)
+
+        candidates = []
+        if self.keys[start] == prefix:
+            candidates.append((-self.counts[start], prefix))
+            start += 1
+        for child, child_start, child_end in self.children(prefix, start, end):
+            candidates.extend(self.collect(child, child_start, child_end))
+        self.top[prefix] = heapq.nsmallest(self.limit, candidates)
+        return self.top[prefix]
+
+    def merge_children(self, prefix):
+        """Recomputes the stored best entries of a prefix from its children"""
+        start, end = self.prefix_range(prefix)
+        candidates = []
+        if start < end and self.keys[start] == prefix:
+            candidates.append((-self.counts[start], prefix))
+            start += 1
+        for child, child_start, child_end in self.children(prefix, start, end):
+            if child in self.top:
+                candidates.extend(self.top[child])
+            else:
+                candidates.extend(self.rank_range(child_start, child_end))
+        self.top[prefix] = heapq.nsmallest(self.limit, candidates)
+
+    def suggest(self, prefix):
+        """Returns up to limit names starting with prefix, most frequent first"""
+        prefix = prefix.casefold()
+        if not prefix:
+            return []
+        with self.lock:
+            best = self.top.get(prefix)
+            if best is None:
+                best = self.rank_range(*self.prefix_range(prefix))
+            return [self.names[self.find(key)] for _, key in best]
+
+    def add(self, name, count=1):
+        """Adds count occurrences of a name"""
+        if name and name.strip():
+            self.change(name, count)
+
+    def remove(self, name, count=1):
+        """Removes count occurrences of a name"""
+        if name and name.strip():
+            self.change(name, -count)
+
+    def change(self, name, delta):
+        key = name.casefold()
+        with self.lock:
+            pos = bisect.bisect_left(self.keys, key)
+            if pos < len(self.keys) and self.keys[pos] == key:
+                self.counts[pos] += delta
+                if self.counts[pos] <= 0:
+                    del self.keys[pos]
+                    del self.names[pos]
+                    del self.counts[pos]
+            elif delta > 0:
+                self.keys.insert(pos, key)
+                self.names.insert(pos, name)
+                self.counts.insert(pos, delta)
+            else:
+                return
+
+            pos = self.find(key)
+            entry = (-self.counts[pos], key) if pos is not None else None
+            # Deepest first, so parents merge children that are already up to date.
+            # Only prefixes of the key can list it, so stored counts stay exact.
+            for length in range(len(key), -1, -1):
+                prefix = key[:length]
+                best = self.top.get(prefix)
+                if best is None:
+                    if delta > 0:
+                        start, end = self.prefix_range(prefix)
+                        if end - start > 2 * self.SCAN_LIMIT:
+                            self.merge_children(prefix)
+                    continue
+
+                others = [other for other in best if other[1] != key]
+                if delta > 0:
+                    self.top[prefix] = heapq.nsmallest(self.limit, others + [entry])
+                elif len(others) < len(best):
+                    # It dropped in rank, something outside the list may now rank higher
+                    self.merge_children(prefix)
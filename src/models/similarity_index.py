@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import re
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy import sparse
+
+# Tokens are hashed into a fixed number of columns, so chunks can be
+# vectorized independently on every core without a shared vocabulary
+N_FEATURES = 1 << 20
+TOKEN_PATTERN = re.compile(r'[^\W\d_]{2,}')
+STOP_WORDS = frozenset('''
+    a an and are as at be but by for from has have he her his in is it its of on or
+    she that the their them they this to was were which who with you your
+'''.split())
+
+def tokenize(text):
+    """Returns the lowercase word tokens of a text without stop words"""
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower())
+            if token not in STOP_WORDS]
+
+def vectorize(texts):
+    """Returns a CSR matrix of sublinear term frequencies, one row per text"""
+    indptr = [0]
+    indices = []
+    data = []
+    for text in texts:
+        counts = Counter(zlib.crc32(token.encode()) & (N_FEATURES - 1)
+                         for token in tokenize(text))
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), indptr),
+        shape=(len(texts), N_FEATURES),
+    )
+    matrix.sum_duplicates()
+    np.log(matrix.data, out=matrix.data)
+    matrix.data += 1
+    return matrix
+
+class SimilarityIndex:
+    """TF-IDF index over character info text for finding related characters.
+
+    Rows hold sublinear term frequencies and are added, replaced or removed
+    one at a time. Queries use an IDF-weighted, normalized copy of the matrix,
+    computed in one vectorized pass when the index is built or loaded. Rows
+    changed after that are weighted on their own with the same IDF and removed
+    rows are masked, so an edit never re-weights the whole matrix.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.tf = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self.row_ids = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.rows_by_id = {}
+        self.pending_ids = []
+        self.pending_rows = []
+        self.idf = None
+        self.weighted = None
+        self.pending_weighted = None
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.rows_by_id)
+
+    def build(self, documents, workers=None, chunk_size=5000):
+        """Rebuilds the index from (chara_id, text) pairs using all cores"""
+        documents = list(documents)
+        ids = [doc[0] for doc in documents]
+        texts = [doc[1] for doc in documents]
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+
+        if len(chunks) > 1:
+            # Forking a process that runs Qt threads is unsafe, workers start fresh
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                matrices = list(executor.map(vectorize, chunks))
+        else:
+            matrices = [vectorize(chunk) for chunk in chunks]
+
+        self.tf = sparse.vstack(matrices, format='csr') if matrices \
+            else sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self.row_ids = np.asarray(ids, dtype=np.int64)
+        self.alive = np.ones(len(ids), dtype=bool)
+        self.rows_by_id = {chara_id: row for row, chara_id in enumerate(ids)}
+        self.pending_ids = []
+        self.pending_rows = []
+        self.weighted = None
+        self.dirty = True
+
+    def update(self, chara_id, text):
+        """Adds or replaces the text of a character"""
+        self.remove(chara_id)
+        row = vectorize([text])
+        self.pending_ids.append(chara_id)
+        self.pending_rows.append(row)
+        self.rows_by_id[chara_id] = len(self.row_ids) + len(self.pending_ids) - 1
+        if self.weighted is not None:
+            self.pending_weighted = sparse.vstack([self.pending_weighted, self.weight(row)],
+                                                  format='csr')
+        self.dirty = True
+
+    def remove(self, chara_id):
+        """Removes a character from the index"""
+        row = self.rows_by_id.pop(chara_id, None)
+        if row is None:
+            return
+        if row < len(self.row_ids):
+            self.alive[row] = False
+        else:
+            pos = row - len(self.row_ids)
+            self.pending_ids[pos] = None
+        self.dirty = True
+
+    def flush(self):
+        """Appends pending rows and drops removed rows once they dominate.
+
+        Row positions change, so the weighted matrix is dropped as well.
+        """
+        if self.pending_rows:
+            self.tf = sparse.vstack([self.tf] + self.pending_rows, format='csr')
+            self.row_ids = np.concatenate([
+                self.row_ids,
+                np.asarray([-1 if chara_id is None else chara_id
+                            for chara_id in self.pending_ids], dtype=np.int64),
+            ])
+            self.alive = np.concatenate([
+                self.alive,
+                np.asarray([chara_id is not None for chara_id in self.pending_ids], dtype=bool),
+            ])
+            self.pending_ids = []
+            self.pending_rows = []
+
+        if len(self.alive) and self.alive.sum() < len(self.alive) // 2:
+            self.tf = self.tf[self.alive]
+            self.row_ids = self.row_ids[self.alive]
+            self.alive = np.ones(len(self.row_ids), dtype=bool)
+            self.rows_by_id = {int(chara_id): row for row, chara_id in enumerate(self.row_ids)}
+        self.weighted = None
+
+    def weight(self, tf):
+        """Returns the rows of a term frequency matrix IDF-weighted and L2-normalized"""
+        weighted = tf.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return (sparse.diags((1 / norms).astype(np.float32)) @ weighted).tocsr()
+
+    def reweight(self):
+        """Recomputes the IDF over the live rows and weights the whole matrix"""
+        self.flush()
+        # Smoothed IDF over the live rows, as in scikit-learn. After
+        # sum_duplicates() every stored entry is one (row, term) pair.
+        live = self.tf[self.alive] if not self.alive.all() else self.tf
+        df = np.bincount(live.indices, minlength=N_FEATURES)
+        self.idf = (np.log((1 + live.shape[0]) / (1 + df)) + 1).astype(np.float32)
+
+        weighted = self.weight(self.tf)
+        self.weighted = (weighted, weighted.tocsc())
+        self.pending_weighted = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+
+    def related(self, chara_id, k=10):
+        """Returns up to k (chara_id, score) pairs most similar to a character"""
+        if self.weighted is None:
+            self.reweight()
+        rows, columns = self.weighted
+        row = self.rows_by_id.get(chara_id)
+        if row is None:
+            return []
+
+        pending = self.pending_weighted
+        query = rows[row] if row < rows.shape[0] else pending[row - rows.shape[0]]
+        if not query.nnz:
+            return []
+
+        # Only the columns of the query terms contribute to the dot products
+        scores = np.concatenate([
+            np.asarray(columns[:, query.indices] @ query.data).ravel(),
+            np.asarray(pending[:, query.indices] @ query.data).ravel(),
+        ])
+        pending_ids = np.asarray([-1 if chara_id is None else chara_id
+                                  for chara_id in self.pending_ids], dtype=np.int64)
+        ids = np.concatenate([self.row_ids, pending_ids])
+        scores[~np.concatenate([self.alive, pending_ids >= 0])] = 0
+        scores[row] = 0
+
+        k = min(k, np.count_nonzero(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def save(self):
+        """Writes the live rows of the index to disk"""
+        tf = sparse.vstack([self.tf] + self.pending_rows, format='csr')
+        row_ids = np.concatenate([self.row_ids, np.asarray(
+            [-1 if chara_id is None else chara_id for chara_id in self.pending_ids],
+            dtype=np.int64)])
+        live = row_ids >= 0
+        live[:len(self.alive)] &= self.alive
+        tf, row_ids = tf[live], row_ids[live]
+
+        temp_path = self.path + '.tmp.npz'
+        np.savez(temp_path, data=tf.data, indices=tf.indices, indptr=tf.indptr,
+                 row_ids=row_ids, alive=np.ones(len(row_ids), dtype=bool))
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def load(self):
+        """Reads the index from disk, returns False if there is none"""
+        if not os.path.exists(self.path):
+            return False
+
+        with np.load(self.path) as stored:
+            self.row_ids = stored['row_ids']
+            self.alive = stored['alive']
+            self.tf = sparse.csr_matrix(
+                (stored['data'], stored['indices'], stored['indptr']),
+                shape=(len(self.row_ids), N_FEATURES),
+            )
+        self.rows_by_id = {int(chara_id): row for row, chara_id in enumerate(self.row_ids)
+                           if self.alive[row]}
+        self.pending_ids = []
+        self.pending_rows = []
+        self.weighted = None
+        self.dirty = False
+        return True
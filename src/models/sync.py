@@ -0,0 +1,225 @@
+import base64
+import gzip
+import json
+import sqlite3
+from models.database import encode_text
+
+DELTA_FORMAT = 2
+
+FRANCHISE_COLUMNS = ['franchise_name', 'franchise_info']
+# character_image is only exported when it changed since the requested version
+CHARACTER_COLUMNS = ['chara_name', 'chara_age', 'is_oc', 'chara_creator', 'chara_info']
+# Stored compressed when long, deltas carry the plain text
+TEXT_COLUMNS = {'franchise_info', 'chara_info'}
+
+def select_columns(columns, prefix=''):
+    return ', '.join(f'decode_text({prefix}{column}) AS {column}' if column in TEXT_COLUMNS
+                     else prefix + column for column in columns)
+
+def stored_values(row, columns):
+    return [encode_text(row[column]) if column in TEXT_COLUMNS else row[column]
+            for column in columns]
+
+def get_sync_state(conn, key):
+    row = conn.execute('SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else None
+
+def get_version(db):
+    """Returns the current change version of the database"""
+    conn = db.get_connection()
+    version = get_sync_state(conn, 'version')
+    conn.close()
+    return version
+
+def export_changes(db, since_version, path):
+    """Writes all changes made after since_version to a compressed delta file.
+
+    Returns the version the delta reaches, to be passed as since_version
+    on the next export.
+    """
+    conn = db.get_connection()
+    conn.row_factory = sqlite3.Row
+
+    version = get_sync_state(conn, 'version')
+    franchises = [dict(row) for row in conn.execute(f'''
+        SELECT s.sync_id, s.updated_at, {select_columns(FRANCHISE_COLUMNS, 'f.')}
+        FROM sync_row s
+        JOIN franchise f ON f.franchise_id = s.row_id
+        WHERE s.table_name = 'franchise' AND s.row_version > ?
+        ORDER BY s.row_version
+    ''', (since_version,))]
+    characters = [dict(row) for row in conn.execute(f'''
+        SELECT s.sync_id, s.updated_at, {select_columns(CHARACTER_COLUMNS, 'c.')},
+               s.image_version > :since AS image_changed,
+               CASE WHEN s.image_version > :since THEN c.character_image END AS character_image,
+               fs.sync_id AS franchise_sync_id
+        FROM sync_row s
+        JOIN character c ON c.chara_id = s.row_id
+        LEFT JOIN sync_row fs ON fs.table_name = 'franchise' AND fs.row_id = c.franchise_id
+        WHERE s.table_name = 'character' AND s.row_version > :since
+        ORDER BY s.row_version
+    ''', {'since': since_version})]
+    tombstones = [dict(row) for row in conn.execute('''
+        SELECT table_name, sync_id, deleted_at
+        FROM tombstone WHERE row_version > ? ORDER BY row_version
+    ''', (since_version,))]
+    source = get_sync_state(conn, 'database_id')
+    conn.close()
+
+    for character in characters:
+        if not character.pop('image_changed'):
+            del character['character_image']
+        elif character['character_image'] is not None:
+            character['character_image'] = base64.b64encode(character['character_image']).decode('ascii')
+
+    delta = {
+        'format': DELTA_FORMAT,
+        'source': source,
+        'since_version': since_version,
+        'version': version,
+        'franchises': franchises,
+        'characters': characters,
+        'tombstones': tombstones,
+    }
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        json.dump(delta, file, separators=(',', ':'))
+    return version
+
+def is_newer(remote_updated_at, local_updated_at):
+    """Last writer wins, ties keep the local row so re-applying is a no-op"""
+    return local_updated_at is None or remote_updated_at > local_updated_at
+
+def get_row_id(conn, table, sync_id):
+    """Returns the local ID of a synced row, or None"""
+    row = conn.execute('SELECT row_id FROM sync_row WHERE table_name = ? AND sync_id = ?',
+                       (table, sync_id)).fetchone()
+    return row[0] if row else None
+
+def apply_row(conn, table, key, columns, values, sync_id, updated_at):
+    """Inserts or updates one row, returns True if something changed"""
+    local = conn.execute(f'''
+        SELECT t.{key}, s.updated_at, {", ".join("t." + column for column in columns)}
+        FROM sync_row s
+        JOIN {table} t ON t.{key} = s.row_id
+        WHERE s.table_name = ? AND s.sync_id = ?
+    ''', (table, sync_id)).fetchone()
+
+    if local is None:
+        # A row deleted here after this edit stays deleted
+        tombstone = conn.execute(
+            'SELECT deleted_at FROM tombstone WHERE table_name = ? AND sync_id = ?',
+            (table, sync_id)
+        ).fetchone()
+        if tombstone is not None and not is_newer(updated_at, tombstone[0]):
+            return False
+        row_id = conn.execute(
+            f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+            values
+        ).lastrowid
+        conn.execute('DELETE FROM tombstone WHERE table_name = ? AND sync_id = ?', (table, sync_id))
+    else:
+        if not is_newer(updated_at, local[1]) or list(local[2:]) == values:
+            return False
+        row_id = local[0]
+        conn.execute(
+            f'UPDATE {table} SET {", ".join(column + " = ?" for column in columns)} '
+            f'WHERE {key} = ?',
+            values + [row_id]
+        )
+
+    # The triggers stamped the row as a local change, it keeps the remote identity and time
+    conn.execute('UPDATE sync_row SET sync_id = ?, updated_at = ? WHERE table_name = ? AND row_id = ?',
+                 (sync_id, updated_at, table, row_id))
+    return True
+
+def apply_changes(db, path):
+    """Merges a delta file in a single transaction.
+
+    Applying the same delta twice changes nothing. Returns a dict with the
+    number of applied franchise, character and delete changes, and under
+    'conflicts' the (remote name, kept local name) pairs of franchise renames
+    that were not applied because the name is taken by another franchise here.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        delta = json.load(file)
+    if delta.get('format') != DELTA_FORMAT:
+        raise ValueError('Unsupported delta file format!')
+
+    applied = {'franchises': 0, 'characters': 0, 'deleted': 0, 'conflicts': []}
+    with db.write_transaction() as conn:
+        # Remote franchise sync IDs merged into a local franchise with another sync ID
+        aliases = {}
+        for franchise in delta['franchises']:
+            sync_id = franchise['sync_id']
+            row_id = get_row_id(conn, 'franchise', sync_id)
+            same_name = conn.execute('''
+                SELECT f.franchise_id, s.sync_id FROM franchise f
+                JOIN sync_row s ON s.table_name = 'franchise' AND s.row_id = f.franchise_id
+                WHERE f.franchise_name = ?
+            ''', (franchise['franchise_name'],)).fetchone()
+
+            if same_name is not None and same_name[0] != row_id:
+                if row_id is None:
+                    # The same franchise created on two machines is merged by name,
+                    # both sides keep the lower sync ID
+                    if sync_id < same_name[1]:
+                        conn.execute("UPDATE sync_row SET sync_id = ? "
+                                     "WHERE table_name = 'franchise' AND row_id = ?",
+                                     (sync_id, same_name[0]))
+                    else:
+                        aliases[sync_id] = same_name[1]
+                        sync_id = same_name[1]
+                else:
+                    # Renamed to a name another franchise has here, the local name stays
+                    local_name = conn.execute('SELECT franchise_name FROM franchise '
+                                              'WHERE franchise_id = ?', (row_id,)).fetchone()[0]
+                    applied['conflicts'].append((franchise['franchise_name'], local_name))
+                    franchise = dict(franchise, franchise_name=local_name)
+
+            values = stored_values(franchise, FRANCHISE_COLUMNS)
+            if apply_row(conn, 'franchise', 'franchise_id', FRANCHISE_COLUMNS, values,
+                         sync_id, franchise['updated_at']):
+                applied['franchises'] += 1
+
+        franchise_ids = dict(conn.execute(
+            "SELECT sync_id, row_id FROM sync_row WHERE table_name = 'franchise'"
+        ))
+        for alias, sync_id in aliases.items():
+            franchise_ids[alias] = franchise_ids.get(sync_id)
+        for character in delta['characters']:
+            columns = CHARACTER_COLUMNS + ['franchise_id']
+            # Deltas only carry images that changed
+            if 'character_image' in character:
+                columns.append('character_image')
+                if character['character_image'] is not None:
+                    character['character_image'] = base64.b64decode(character['character_image'])
+            character['franchise_id'] = franchise_ids.get(character['franchise_sync_id'])
+            values = stored_values(character, columns)
+            if apply_row(conn, 'character', 'chara_id', columns, values,
+                         character['sync_id'], character['updated_at']):
+                applied['characters'] += 1
+
+        # Characters first, so franchises are no longer referenced when deleted
+        tombstones = sorted(delta['tombstones'], key=lambda row: row['table_name'] != 'character')
+        for tombstone in tombstones:
+            table = tombstone['table_name']
+            if table not in db.TRACKED_TABLES:
+                continue
+            local = conn.execute('SELECT row_id, updated_at FROM sync_row '
+                                 'WHERE table_name = ? AND sync_id = ?',
+                                 (table, tombstone['sync_id'])).fetchone()
+            if local is None or not is_newer(tombstone['deleted_at'], local[1]):
+                continue
+            key = db.TRACKED_TABLES[table][0]
+            try:
+                conn.execute(f'DELETE FROM {table} WHERE {key} = ?', (local[0],))
+            except sqlite3.IntegrityError:
+                # Still used by local characters, keep it
+                continue
+            conn.execute('UPDATE tombstone SET deleted_at = ? WHERE table_name = ? AND sync_id = ?',
+                         (tombstone['deleted_at'], table, tombstone['sync_id']))
+            applied['deleted'] += 1
+
+        conn.execute('INSERT OR REPLACE INTO sync_state VALUES (?, ?)',
+                     (f"applied:{delta['source']}", delta['version']))
+    return applied
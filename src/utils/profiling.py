@@ -0,0 +1,178 @@
+import cProfile
+import csv
+import functools
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from models.database import get_database_path
+
+# CHARACTER_EXPLORER_PROFILE=1 profiles every UI action,
+# CHARACTER_EXPLORER_PROFILE=memory also records allocations with tracemalloc
+PROFILE_ENV = 'CHARACTER_EXPLORER_PROFILE'
+SUMMARY_FIELDS = ['time', 'action', 'trace', 'wall_ms', 'cpu_ms', 'allocated_bytes',
+                  'peak_bytes', 'profile']
+
+_profile_setting = os.environ.get(PROFILE_ENV, '').strip().lower()
+enabled = _profile_setting not in ('', '0', 'false', 'off')
+trace_memory = _profile_setting == 'memory'
+
+# Only one cProfile can be active at a time, nested or concurrent
+# actions run unprofiled and are part of the outer action's profile
+_active = threading.Lock()
+
+# Traces finish on the UI thread while profiled calls finish on workers,
+# both append to summary.csv
+_summary_lock = threading.Lock()
+
+# The trace of the multi-step action the current thread is working on
+_current = threading.local()
+
+class Trace:
+    """A UI action that spans several callbacks and threads.
+
+    Every profile recorded while the trace is current is tagged with its ID,
+    and finish() adds a summary line with the total time since the click.
+    """
+    def __init__(self, action):
+        self.action = action
+        self.id = f'{datetime.now():%Y%m%d-%H%M%S-%f}'
+        self.started = time.perf_counter()
+        self.finished = False
+
+    def finish(self):
+        """Records the total wall time of the action once"""
+        if self.finished:
+            return
+        self.finished = True
+        wall_ms = (time.perf_counter() - self.started) * 1000
+        write_summary(get_profile_dir(), {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'action': self.action,
+            'trace': self.id,
+            'wall_ms': f'{wall_ms:.2f}',
+        })
+
+def start_trace(action):
+    """Starts a multi-step action, returns None if profiling is off"""
+    return Trace(action) if enabled else None
+
+def current_trace():
+    """Returns the trace the current thread is working on, or None"""
+    return getattr(_current, 'trace', None)
+
+@contextmanager
+def trace_context(trace):
+    """Makes trace the current trace of this thread for the enclosed code"""
+    previous = current_trace()
+    _current.trace = trace
+    try:
+        yield
+    finally:
+        _current.trace = previous
+
+def set_enabled(profile, memory=None):
+    """Turns profiling of UI actions on or off"""
+    global enabled, trace_memory
+    enabled = profile
+    if memory is not None:
+        trace_memory = memory
+
+def get_profile_dir():
+    """Returns the folder profiles are written to, next to the database"""
+    profile_dir = os.path.join(os.path.dirname(get_database_path()), 'profiles')
+    os.makedirs(profile_dir, exist_ok=True)
+    return profile_dir
+
+def write_summary(profile_dir, row):
+    """Appends one action to summary.csv"""
+    summary_path = os.path.join(profile_dir, 'summary.csv')
+    with _summary_lock:
+        new_file = not os.path.exists(summary_path)
+        if not new_file:
+            with open(summary_path, newline='') as file:
+                header = next(csv.reader(file), None)
+            if header != SUMMARY_FIELDS:
+                # Written by a version with other columns, keep it aside
+                os.replace(summary_path, os.path.join(
+                    profile_dir, f'summary-{datetime.now():%Y%m%d-%H%M%S}.csv'))
+                new_file = True
+        with open(summary_path, 'a', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS, restval='')
+            if new_file:
+                writer.writeheader()
+            writer.writerow(row)
+
+@contextmanager
+def profile_action(action):
+    """Profiles the enclosed code as one action if profiling is enabled.
+
+    Writes <time>-<action>.prof (open it with pstats or snakeviz) and a line
+    with wall time, CPU time and allocated bytes to summary.csv. Inside a
+    trace, the file name starts with the trace ID instead of the time.
+    """
+    trace = current_trace()
+    if not enabled or not _active.acquire(blocking=False):
+        yield
+        return
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+
+    profile = cProfile.Profile()
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        wall_ms = (time.perf_counter() - wall_start) * 1000
+        cpu_ms = (time.thread_time() - cpu_start) * 1000
+
+        allocated_bytes = peak_bytes = ''
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            allocated_bytes = current - memory_before
+            peak_bytes = peak - memory_before
+        if started_tracing:
+            tracemalloc.stop()
+
+        try:
+            now = datetime.now()
+            profile_dir = get_profile_dir()
+            safe_action = re.sub(r'[^\w.]', '_', action)
+            prefix = trace.id if trace else f'{now:%Y%m%d-%H%M%S-%f}'
+            file_name = f'{prefix}-{safe_action}.prof'
+            profile.dump_stats(os.path.join(profile_dir, file_name))
+            write_summary(profile_dir, {
+                'time': now.isoformat(timespec='milliseconds'),
+                'action': action,
+                'trace': trace.id if trace else '',
+                'wall_ms': f'{wall_ms:.2f}',
+                'cpu_ms': f'{cpu_ms:.2f}',
+                'allocated_bytes': allocated_bytes,
+                'peak_bytes': peak_bytes,
+                'profile': file_name,
+            })
+        finally:
+            _active.release()
+
+def profiled(action=None):
+    """Decorator that profiles each call with profile_action"""
+    def decorator(func):
+        name = action or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_action(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
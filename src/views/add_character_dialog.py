@@ -3,6 +3,9 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QSpinBox, QCheckBox, QComboBox, QFileDialog, QMessageBox)
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtCore import Qt
+from views.franchise_list_model import setup_franchise_combo, get_selected_franchise_id
+from utils.profiling import profiled
+from models.database import DatabaseBusyError
 
 class AddCharacterDialog(QDialog):
     def __init__(self, controller, parent=None):
@@ -11,6 +14,7 @@ class AddCharacterDialog(QDialog):
         self.image_data = None
         self.init_ui()
     
+    @profiled()
     def init_ui(self):
         """Initializes the dialog"""
         self.setWindowTitle('Add Character')
@@ -73,9 +77,9 @@ class AddCharacterDialog(QDialog):
         # Buttons
         button_layout = QHBoxLayout()
         
-        save_btn = QPushButton('Save')
-        save_btn.clicked.connect(self.save_character)
-        button_layout.addWidget(save_btn)
+        self.save_btn = QPushButton('Save')
+        self.save_btn.clicked.connect(self.save_character)
+        button_layout.addWidget(self.save_btn)
         
         cancel_btn = QPushButton('Cancel')
         cancel_btn.clicked.connect(self.reject)
@@ -84,13 +88,8 @@ class AddCharacterDialog(QDialog):
         layout.addLayout(button_layout)
     
     def load_franchises(self):
-        """Loads all franchises into the combo box"""
-        self.franchise_combo.clear()
-        self.franchise_combo.addItem('None', None)
-        
-        franchises = self.controller.get_all_franchises()
-        for franchise in franchises:
-            self.franchise_combo.addItem(franchise[1], franchise[0])
+        """Attaches the shared franchise model to the combo box"""
+        self.franchise_model = setup_franchise_combo(self.franchise_combo, self.controller)
     
     def add_new_franchise(self):
         """Opens a simple input dialog for new franchise"""
@@ -99,12 +98,14 @@ class AddCharacterDialog(QDialog):
         name, ok = QInputDialog.getText(self, 'New Franchise', 'Franchise Name:')
         if ok and name.strip():
             info, ok2 = QInputDialog.getMultiLineText(self, 'New Franchise', 'Franchise Info (optional):')
-            franchise_id = self.controller.add_franchise(name.strip(), info if ok2 else '')
-            self.load_franchises()
-            # Select the newly added franchise
-            index = self.franchise_combo.findData(franchise_id)
-            if index >= 0:
-                self.franchise_combo.setCurrentIndex(index)
+            self.controller.call('add_franchise', name.strip(), info if ok2 else '',
+                                 on_result=self.select_franchise, on_error=self.show_error)
+    
+    def select_franchise(self, franchise_id):
+        """Selects a franchise in the combo box"""
+        index = self.franchise_combo.findData(franchise_id)
+        if index >= 0:
+            self.franchise_combo.setCurrentIndex(index)
     
     def select_image(self):
         """Opens file dialog to select an image"""
@@ -140,10 +141,28 @@ class AddCharacterDialog(QDialog):
         is_oc = 1 if self.oc_checkbox.isChecked() else 0
         creator = self.creator_input.text().strip() or None
         info = self.info_input.toPlainText().strip() or None
-        franchise_id = self.franchise_combo.currentData()
+        try:
+            franchise_id = get_selected_franchise_id(self.franchise_combo)
+        except ValueError as e:
+            QMessageBox.warning(self, 'Validation Error', str(e))
+            return
         
-        self.controller.add_character(
-            name, age, is_oc, creator, info, franchise_id, self.image_data
+        # Saved on the database thread, the dialog closes once it is done
+        self.save_btn.setEnabled(False)
+        self.controller.call(
+            'add_character', name, age, is_oc, creator, info, franchise_id, self.image_data,
+            on_result=lambda result: self.accept(),
+            on_error=self.save_failed
         )
-        
-        self.accept()
+    
+    def save_failed(self, exception):
+        """Re-enables saving after a failed save"""
+        self.save_btn.setEnabled(True)
+        self.show_error(exception)
+    
+    def show_error(self, exception):
+        """Shows a failed database call"""
+        if isinstance(exception, DatabaseBusyError):
+            QMessageBox.warning(self, 'Database Busy', str(exception))
+        else:
+            QMessageBox.critical(self, 'Error', str(exception))
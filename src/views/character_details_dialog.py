@@ -1,14 +1,21 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QPushButton, QTextEdit, QScrollArea, QWidget)
+                             QPushButton, QTextEdit, QScrollArea, QWidget,
+                             QListWidget, QListWidgetItem)
 from PyQt6.QtGui import QPixmap
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
+from utils.profiling import profiled
 
 class CharacterDetailsDialog(QDialog):
-    def __init__(self, character, parent=None):
+    # Emitted with the chara_id of a double-clicked related character
+    related_selected = pyqtSignal(int)
+    
+    def __init__(self, character, parent=None, related=None):
         super().__init__(parent)
         self.character = character
+        self.related = related or []
         self.init_ui()
     
+    @profiled()
     def init_ui(self):
         """Initializes the detail view"""
         self.setWindowTitle('Character Details')
@@ -87,6 +94,22 @@ class CharacterDetailsDialog(QDialog):
             info_text.setMaximumHeight(150)
             scroll_layout.addWidget(info_text)
         
+        # Related Characters, as (chara_id, chara_name, score)
+        if self.related:
+            related_label = QLabel("<b>Related Characters:</b>")
+            scroll_layout.addWidget(related_label)
+            
+            related_list = QListWidget()
+            for chara_id, chara_name, score in self.related:
+                item = QListWidgetItem(f'{chara_name} ({score:.0%} similar)')
+                item.setData(Qt.ItemDataRole.UserRole, chara_id)
+                related_list.addItem(item)
+            related_list.setMaximumHeight(120)
+            related_list.itemDoubleClicked.connect(
+                lambda item: self.related_selected.emit(item.data(Qt.ItemDataRole.UserRole))
+            )
+            scroll_layout.addWidget(related_list)
+        
         scroll_layout.addStretch()
         
         scroll.setWidget(scroll_content)
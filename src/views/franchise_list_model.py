@@ -0,0 +1,123 @@
+import bisect
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt6.QtWidgets import QCompleter
+
+class FranchiseListModel(QAbstractListModel):
+    """Application-wide list of franchises shared by all dialogs.
+
+    Row 0 is the 'None' entry, the remaining rows are the franchises sorted
+    by name. Only (franchise_id, franchise_name) is loaded, once, on the
+    database thread of the AsyncCharacterController, and the list is updated
+    incrementally when the controller reports changes.
+    """
+    _shared = None
+
+    # Emitted by the controller callback, so changes made from other threads
+    # are queued to the thread that owns the model
+    franchise_changed = pyqtSignal(str, object, object)
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.franchises = []
+        self.sort_keys = []
+        self.rows_by_id = {}
+
+        self.franchise_changed.connect(self.apply_change)
+        controller.sync_controller.add_franchise_listener(self.franchise_changed.emit)
+        self.reload()
+
+    @classmethod
+    def shared(cls, controller):
+        """Returns the model shared by the whole application"""
+        if cls._shared is None or cls._shared.controller is not controller:
+            cls._shared = cls(controller)
+        return cls._shared
+
+    def rebuild_row_lookup(self):
+        """Maps franchise IDs to their position in the sorted list"""
+        self.rows_by_id = {franchise[0]: pos for pos, franchise in enumerate(self.franchises)}
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.franchises) + 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return 'None' if row == 0 else self.franchises[row - 1][1]
+        if role == Qt.ItemDataRole.UserRole:
+            return None if row == 0 else self.franchises[row - 1][0]
+        return None
+
+    def reload(self):
+        """Loads all franchises in the background, also after the database was replaced"""
+        self.controller.call('get_franchise_names', on_result=self.set_franchises)
+
+    def set_franchises(self, franchises):
+        """Replaces the list with loaded (franchise_id, franchise_name) pairs"""
+        self.beginResetModel()
+        self.franchises = list(franchises)
+        self.sort_keys = [franchise[1] for franchise in self.franchises]
+        self.rebuild_row_lookup()
+        self.endResetModel()
+
+    def apply_change(self, event, franchise_id, franchise_name):
+        """Inserts, renames or removes a single franchise row"""
+        if event in ('updated', 'deleted') and franchise_id in self.rows_by_id:
+            self.remove_franchise(franchise_id)
+        if event in ('added', 'updated') and franchise_id is not None \
+                and franchise_id not in self.rows_by_id:
+            self.insert_franchise(franchise_id, franchise_name)
+
+    def insert_franchise(self, franchise_id, franchise_name):
+        """Inserts a franchise at its sorted position"""
+        pos = bisect.bisect_right(self.sort_keys, franchise_name)
+        self.beginInsertRows(QModelIndex(), pos + 1, pos + 1)
+        self.franchises.insert(pos, (franchise_id, franchise_name))
+        self.sort_keys.insert(pos, franchise_name)
+        self.rebuild_row_lookup()
+        self.endInsertRows()
+
+    def remove_franchise(self, franchise_id):
+        """Removes a franchise row"""
+        pos = self.rows_by_id[franchise_id]
+        self.beginRemoveRows(QModelIndex(), pos + 1, pos + 1)
+        del self.franchises[pos]
+        del self.sort_keys[pos]
+        self.rebuild_row_lookup()
+        self.endRemoveRows()
+
+def setup_franchise_combo(combo, controller):
+    """Attaches the shared franchise model and a prefix completer to a combo box"""
+    model = FranchiseListModel.shared(controller)
+    combo.setModel(model)
+    combo.setEditable(True)
+    combo.setInsertPolicy(combo.InsertPolicy.NoInsert)
+    combo.view().setUniformItemSizes(True)
+
+    completer = QCompleter(model, combo)
+    completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+    completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    completer.setFilterMode(Qt.MatchFlag.MatchStartsWith)
+    combo.setCompleter(completer)
+    combo.setCurrentIndex(0)
+    return model
+
+def get_selected_franchise_id(combo):
+    """Returns the ID of the franchise typed or picked in the combo, None for 'None'.
+
+    The typed text counts even if it was never picked from the completer.
+    Raises ValueError if it matches no franchise.
+    """
+    text = combo.currentText().strip()
+    if not text:
+        return None
+    index = combo.findText(text, Qt.MatchFlag.MatchFixedString)
+    if index < 0:
+        raise ValueError(f"Unknown franchise '{text}', pick one from the list or add it first!")
+    return combo.itemData(index)
@@ -0,0 +1,183 @@
+from collections import OrderedDict
+from PyQt6.QtWidgets import QListView
+from PyQt6.QtGui import QImage, QPixmap, QIcon, QColor
+from PyQt6.QtCore import (Qt, QAbstractListModel, QModelIndex, QObject, QRunnable,
+                          QThread, QThreadPool, QTimer, QSize, QPoint, pyqtSignal)
+
+THUMBNAIL_SIZE = 128
+
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(int, QImage)
+
+class ThumbnailLoader(QRunnable):
+    """Reads and decodes one character image on a worker thread"""
+    def __init__(self, controller, character_id, signals):
+        super().__init__()
+        self.controller = controller
+        self.character_id = character_id
+        self.signals = signals
+
+    def run(self):
+        image = QImage()
+        image_data = self.controller.get_character_image(self.character_id)
+        if image_data and image.loadFromData(image_data):
+            # QImage (unlike QPixmap) may be scaled off the GUI thread
+            image = image.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE,
+                                 Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        self.signals.loaded.emit(self.character_id, image)
+
+class CharacterGalleryModel(QAbstractListModel):
+    """Character names with thumbnails that are loaded on demand.
+
+    Thumbnails are only requested for the rows the view asks for, decoded on
+    a separate thread pool and kept in a bounded LRU cache.
+    """
+    def __init__(self, controller, cache_size=600, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.characters = []
+        self.rows_by_id = {}
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.loading = set()
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, QThread.idealThreadCount() - 1))
+        self.signals = ThumbnailSignals()
+        self.signals.loaded.connect(self.thumbnail_loaded)
+
+        placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        placeholder.fill(QColor('lightgray'))
+        self.placeholder = QIcon(placeholder)
+
+    def set_characters(self, characters):
+        """Shows (chara_id, chara_name, ..., has_image) rows"""
+        self.beginResetModel()
+        self.characters = [(character[0], character[1], bool(character[7]))
+                           for character in characters]
+        self.rows_by_id = {character[0]: row for row, character in enumerate(self.characters)}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.characters)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        character_id, name, has_image = self.characters[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name
+        if role == Qt.ItemDataRole.UserRole:
+            return character_id
+        if role == Qt.ItemDataRole.DecorationRole:
+            icon = self.cache.get(character_id)
+            if icon is None or not has_image:
+                return self.placeholder
+            self.cache.move_to_end(character_id)
+            return icon
+        return None
+
+    def request_thumbnails(self, first_row, last_row):
+        """Loads the thumbnails of a range of rows, dropping older queued requests"""
+        self.pool.clear()
+        self.loading.clear()
+
+        for row in range(max(first_row, 0), min(last_row + 1, len(self.characters))):
+            character_id, _, has_image = self.characters[row]
+            if not has_image:
+                continue
+            if character_id in self.cache:
+                self.cache.move_to_end(character_id)
+            elif character_id not in self.loading:
+                self.loading.add(character_id)
+                self.pool.start(ThumbnailLoader(self.controller, character_id, self.signals))
+
+    def thumbnail_loaded(self, character_id, image):
+        """Caches a decoded thumbnail and refreshes its row"""
+        self.loading.discard(character_id)
+        icon = QIcon(QPixmap.fromImage(image)) if not image.isNull() else self.placeholder
+        self.cache[character_id] = icon
+        self.cache.move_to_end(character_id)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+        row = self.rows_by_id.get(character_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def invalidate(self, character_id):
+        """Drops a cached thumbnail after the character image changed"""
+        self.cache.pop(character_id, None)
+
+    def clear_cache(self):
+        """Drops all thumbnails after the database was replaced"""
+        self.pool.clear()
+        self.loading.clear()
+        self.cache.clear()
+
+class GalleryView(QListView):
+    """Icon grid that requests thumbnails for the visible rows only"""
+    character_activated = pyqtSignal(int)
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.gallery_model = CharacterGalleryModel(controller, parent=self)
+        self.setModel(self.gallery_model)
+
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.setGridSize(QSize(THUMBNAIL_SIZE + 32, THUMBNAIL_SIZE + 40))
+        self.setUniformItemSizes(True)
+        self.setWordWrap(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(500)
+
+        # Scrolling restarts the timer, so only the final position is loaded
+        self.viewport_timer = QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(50)
+        self.viewport_timer.timeout.connect(self.load_visible_thumbnails)
+        self.verticalScrollBar().valueChanged.connect(self.viewport_timer.start)
+        self.gallery_model.modelReset.connect(self.viewport_timer.start)
+
+        self.doubleClicked.connect(
+            lambda index: self.character_activated.emit(index.data(Qt.ItemDataRole.UserRole))
+        )
+
+    def set_characters(self, characters):
+        """Shows the given character rows"""
+        self.gallery_model.set_characters(characters)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.viewport_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.viewport_timer.start()
+
+    def load_visible_thumbnails(self):
+        """Requests thumbnails for the visible rows plus one page before and after"""
+        if not self.isVisible() or not self.gallery_model.rowCount():
+            return
+
+        viewport = self.viewport().rect()
+        grid = self.gridSize()
+        first = self.indexAt(QPoint(viewport.left() + grid.width() // 2,
+                                    viewport.top() + grid.height() // 2))
+        first_row = first.row() if first.isValid() else 0
+
+        # Items are laid out row by row in a uniform grid
+        columns = max(1, viewport.width() // grid.width())
+        visible_lines = viewport.height() // grid.height() + 2
+        page = columns * visible_lines
+        last_row = first_row + page - 1
+
+        self.gallery_model.request_thumbnails(first_row - page, last_row + page)
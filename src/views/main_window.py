@@ -1,19 +1,57 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QTableWidget, QTableWidgetItem, 
-                             QMessageBox, QLineEdit, QLabel, QHeaderView)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QIcon
+                             QMessageBox, QLineEdit, QLabel, QHeaderView,
+                             QFileDialog, QProgressDialog, QApplication,
+                             QStackedWidget, QCompleter)
+from PyQt6.QtCore import Qt, QStringListModel, QThreadPool
+from PyQt6.QtGui import QIcon, QAction, QActionGroup
 from views.add_character_dialog import AddCharacterDialog
 from views.edit_character_dialog import EditCharacterDialog
 from views.character_details_dialog import CharacterDetailsDialog
+from views.gallery_view import GalleryView
+from views.statistics_dialog import StatisticsDialog
+from views.franchise_list_model import FranchiseListModel
+from controllers.maintenance_scheduler import MaintenanceScheduler
+from controllers.backup_worker import BackupWorker, SnapshotScheduler
+from controllers.async_controller import AsyncCharacterController
+from models.database import DatabaseBusyError
+from utils.helpers import format_size
+from utils import profiling
+from utils.profiling import profiled
 
 class MainWindow(QMainWindow):
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
+        self.async_controller = AsyncCharacterController(controller, self)
+        self.async_controller.busy_changed.connect(self.show_busy)
+        self.async_controller.error.connect(self.show_database_error)
         self.all_characters = []
         self.init_ui()
         self.load_characters()
+        # Loaded once here, the dialogs share it
+        FranchiseListModel.shared(self.async_controller)
+        self.async_controller.call('build_name_index')
+        # Loading or rebuilding the related-characters index can take a while,
+        # so it does not run on the database thread
+        QThreadPool.globalInstance().start(self.controller.load_similarity_index)
+        
+        self.maintenance = MaintenanceScheduler(self.controller.db, parent=self)
+        self.maintenance.stats_updated.connect(self.show_storage_stats)
+        self.maintenance.compacted.connect(self.show_compact_result)
+        self.maintenance.failed.connect(self.show_maintenance_error)
+        self.maintenance.integrity_checked.connect(self.show_integrity_result)
+        self.maintenance.refresh_stats()
+        
+        if self.controller.db.compression_report:
+            rows, saved = self.controller.db.compression_report
+            self.statusBar().showMessage(
+                f'Compressed {rows} long info texts, saved {format_size(saved)}', 10000)
+        
+        self.backup_worker = None
+        self.compact_progress = None
+        self.snapshots = SnapshotScheduler(self.controller.db.db_path, parent=self)
+        self.snapshots.failed.connect(self.show_maintenance_error)
     
     def init_ui(self):
         """Initializes the user interface"""
@@ -23,6 +61,49 @@ class MainWindow(QMainWindow):
         logo_path = 'assets/character_explorer_logo.png'
         self.setWindowIcon(QIcon(logo_path))
         
+        # Menu
+        tools_menu = self.menuBar().addMenu('Tools')
+        
+        statistics_action = QAction('Statistics...', self)
+        statistics_action.triggered.connect(self.show_statistics)
+        tools_menu.addAction(statistics_action)
+        
+        tools_menu.addSeparator()
+        
+        compact_action = QAction('Compact Database', self)
+        compact_action.triggered.connect(self.compact_database)
+        tools_menu.addAction(compact_action)
+        
+        tools_menu.addSeparator()
+        
+        backup_action = QAction('Back Up Database...', self)
+        backup_action.triggered.connect(self.backup_database)
+        tools_menu.addAction(backup_action)
+        
+        restore_action = QAction('Restore Database...', self)
+        restore_action.triggered.connect(self.restore_database)
+        tools_menu.addAction(restore_action)
+        
+        tools_menu.addSeparator()
+        
+        profiling_action = QAction('Profile UI Actions', self, checkable=True,
+                                   checked=profiling.enabled)
+        profiling_action.toggled.connect(self.toggle_profiling)
+        tools_menu.addAction(profiling_action)
+        
+        view_menu = self.menuBar().addMenu('View')
+        view_group = QActionGroup(self)
+        
+        table_action = QAction('Table', self, checkable=True, checked=True)
+        table_action.triggered.connect(lambda: self.views.setCurrentWidget(self.table))
+        view_group.addAction(table_action)
+        view_menu.addAction(table_action)
+        
+        gallery_action = QAction('Gallery', self, checkable=True)
+        gallery_action.triggered.connect(lambda: self.views.setCurrentWidget(self.gallery))
+        view_group.addAction(gallery_action)
+        view_menu.addAction(gallery_action)
+        
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         
@@ -34,7 +115,15 @@ class MainWindow(QMainWindow):
         search_label = QLabel('Search:')
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText('Search by name, creator, or franchise...')
-        self.search_input.textChanged.connect(self.filter_table)
+        self.search_input.textChanged.connect(lambda text: self.filter_table())
+        self.search_input.textEdited.connect(self.suggest_names)
+        
+        # Suggestions come ranked from the name index, the completer only shows them
+        self.suggestions = QStringListModel(self)
+        self.search_completer = QCompleter(self.suggestions, self)
+        self.search_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.search_completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.search_input.setCompleter(self.search_completer)
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_input)
         layout.addLayout(search_layout)
@@ -52,7 +141,15 @@ class MainWindow(QMainWindow):
         self.table.setColumnWidth(3, 100)
         
         self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        layout.addWidget(self.table)
+        
+        # Gallery
+        self.gallery = GalleryView(self.controller)
+        self.gallery.character_activated.connect(self.show_details)
+        
+        self.views = QStackedWidget()
+        self.views.addWidget(self.table)
+        self.views.addWidget(self.gallery)
+        layout.addWidget(self.views)
         
         # Buttons
         button_layout = QHBoxLayout()
@@ -72,19 +169,29 @@ class MainWindow(QMainWindow):
         button_layout.addStretch()
         
         layout.addLayout(button_layout)
+        
+        self.storage_label = QLabel()
+        self.statusBar().addPermanentWidget(self.storage_label)
     
     def load_characters(self):
-        """Loads all characters into the table"""
-        self.all_characters = self.controller.get_all_characters()
-        self.display_characters(self.all_characters)
+        """Loads all characters into the table in the background"""
+        self.async_controller.call('get_all_characters', on_result=self.characters_loaded)
     
+    @profiled()
+    def characters_loaded(self, characters):
+        """Displays the loaded characters"""
+        self.all_characters = characters
+        self.filter_table()
+    
+    @profiled()
     def display_characters(self, characters):
-        """Displays characters in the table"""
+        """Displays characters in the table and the gallery"""
+        self.gallery.set_characters(characters)
         self.table.setRowCount(len(characters))
         
         for row, character in enumerate(characters):
             # character format: (chara_id, chara_name, chara_creator, franchise_name, 
-            #                    chara_age, is_oc, chara_info, franchise_id, character_image)
+            #                    chara_age, is_oc, franchise_id, has_image)
             
             # Character Name
             name_item = QTableWidgetItem(character[1])
@@ -104,6 +211,15 @@ class MainWindow(QMainWindow):
             details_btn.clicked.connect(lambda checked, c_id=character[0]: self.show_details(c_id))
             self.table.setCellWidget(row, 3, details_btn)
     
+    def suggest_names(self, text):
+        """Shows the most frequent names starting with the typed text"""
+        self.suggestions.setStringList(self.controller.suggest_names(text.strip()))
+        if self.suggestions.rowCount():
+            self.search_completer.complete()
+        else:
+            self.search_completer.popup().hide()
+    
+    @profiled()
     def filter_table(self):
         """Filters the table based on search input"""
         search_term = self.search_input.text().lower()
@@ -122,15 +238,47 @@ class MainWindow(QMainWindow):
         self.display_characters(filtered_characters)
     
     def show_details(self, character_id):
+        """Loads a character in the background and shows its details"""
+        # Profiled from the click until the dialog is shown, across all steps
+        with profiling.trace_context(profiling.start_trace('MainWindow.show_details')):
+            self.async_controller.call('get_character_by_id', character_id,
+                                       on_result=self.open_details,
+                                       on_error=self.details_failed)
+    
+    def details_failed(self, exception):
+        """Ends the traced action and reports a character that could not be loaded"""
+        self.finish_trace()
+        self.show_database_error(exception)
+    
+    def open_details(self, character):
+        """Loads the related characters of a loaded character"""
+        if not character:
+            self.finish_trace()
+        else:
+            self.async_controller.call(
+                'get_related_characters', character[0],
+                on_result=lambda related: self.open_details_dialog(character, related),
+                on_error=lambda e: self.open_details_dialog(character, [])
+            )
+    
+    def open_details_dialog(self, character, related):
         """Shows character details dialog"""
-        character = self.controller.get_character_by_id(character_id)
-        if character:
-            dialog = CharacterDetailsDialog(character, self)
+        dialog = CharacterDetailsDialog(character, self, related)
+        dialog.related_selected.connect(self.show_details)
+        self.finish_trace()
+        # Actions taken inside the dialog are not part of this one
+        with profiling.trace_context(None):
             dialog.exec()
     
+    def finish_trace(self):
+        """Records the total time of the traced action the current callback belongs to"""
+        trace = profiling.current_trace()
+        if trace is not None:
+            trace.finish()
+    
     def add_character(self):
         """Opens dialog to add a character"""
-        dialog = AddCharacterDialog(self.controller, self)
+        dialog = AddCharacterDialog(self.async_controller, self)
         if dialog.exec():
             self.load_characters()
             self.search_input.clear()
@@ -144,10 +292,17 @@ class MainWindow(QMainWindow):
             return
         
         character_id = self.table.item(selected_row, 0).data(Qt.ItemDataRole.UserRole)
-        character = self.controller.get_character_by_id(character_id)
+        self.async_controller.call('get_character_by_id', character_id,
+                                   on_result=self.open_edit_dialog)
+    
+    def open_edit_dialog(self, character):
+        """Opens the edit dialog for a loaded character"""
+        if not character:
+            return
         
-        dialog = EditCharacterDialog(character, self.controller, self)
+        dialog = EditCharacterDialog(character, self.async_controller, self)
         if dialog.exec():
+            self.gallery.gallery_model.invalidate(character[0])
             self.load_characters()
             self.search_input.clear()
             QMessageBox.information(self, 'Success', 'Character updated successfully!')
@@ -169,7 +324,174 @@ class MainWindow(QMainWindow):
         
         if reply == QMessageBox.StandardButton.Yes:
             character_id = self.table.item(selected_row, 0).data(Qt.ItemDataRole.UserRole)
-            self.controller.delete_character(character_id)
+            self.async_controller.call('delete_character', character_id,
+                                       on_result=self.character_deleted)
+    
+    def character_deleted(self, result):
+        """Reloads the table after a character was deleted"""
+        self.load_characters()
+        self.search_input.clear()
+        QMessageBox.information(self, 'Success', 'Character deleted successfully!')
+    
+    def show_busy(self, busy):
+        """Shows a busy cursor while database calls are running"""
+        if busy:
+            QApplication.setOverrideCursor(Qt.CursorShape.BusyCursor)
+            self.statusBar().showMessage('Loading...')
+        else:
+            QApplication.restoreOverrideCursor()
+            self.statusBar().clearMessage()
+    
+    def show_database_error(self, exception):
+        """Reports a failed database call"""
+        if isinstance(exception, DatabaseBusyError):
+            QMessageBox.warning(self, 'Database Busy', str(exception))
+        else:
+            QMessageBox.critical(self, 'Error', f'Database error: {exception}')
+    
+    def closeEvent(self, event):
+        """Stops the database thread and saves the related-characters index"""
+        self.async_controller.shutdown()
+        self.controller.save_similarity_index()
+        super().closeEvent(event)
+    
+    def show_statistics(self):
+        """Shows the archive statistics dashboard"""
+        dialog = StatisticsDialog(self.async_controller, self)
+        dialog.exec()
+    
+    def toggle_profiling(self, checked):
+        """Turns per-action profiling on or off"""
+        profiling.set_enabled(checked)
+        if checked:
+            self.statusBar().showMessage(
+                f'Profiles are written to {profiling.get_profile_dir()}', 10000
+            )
+    
+    def compact_database(self):
+        """Frees all unused database pages in the background"""
+        self.async_controller.call('needs_vacuum', on_result=self.confirm_compact)
+    
+    def confirm_compact(self, needs_vacuum):
+        """Asks before the one-time rewrite of the file, then starts compacting"""
+        if needs_vacuum:
+            answer = QMessageBox.question(
+                self, 'Compact Database',
+                'The database file is rewritten once so unused space can be freed in the '
+                'background from now on. This can take several minutes for large files and '
+                'needs free disk space as large as the database. Continue?'
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+            self.compact_progress = QProgressDialog('Rewriting the database file...', None, 0, 0, self)
+            self.compact_progress.setWindowTitle('Compact Database')
+            self.compact_progress.setMinimumDuration(0)
+            self.compact_progress.show()
+        self.statusBar().showMessage('Compacting database...')
+        self.maintenance.compact_now()
+    
+    def close_compact_progress(self):
+        if self.compact_progress is not None:
+            self.compact_progress.close()
+            self.compact_progress = None
+    
+    def show_storage_stats(self, stats):
+        """Shows database size and free-page ratio in the status bar"""
+        self.storage_label.setText(
+            f"Database: {format_size(stats['file_size'])}, "
+            f"{stats['free_ratio']:.1%} free"
+        )
+        if stats['needs_vacuum']:
+            self.storage_label.setToolTip('Run Tools > Compact Database once to free unused '
+                                          'space in the background')
+    
+    def show_compact_result(self, bytes_reclaimed):
+        """Reports the result of a compaction"""
+        self.close_compact_progress()
+        self.statusBar().clearMessage()
+        QMessageBox.information(self, 'Compact Database',
+                                f'Reclaimed {format_size(bytes_reclaimed)}.')
+    
+    def show_maintenance_error(self, message):
+        """Reports a failed maintenance run"""
+        self.close_compact_progress()
+        self.statusBar().showMessage(f'Database maintenance failed: {message}', 10000)
+    
+    def show_integrity_result(self, problems):
+        """Reports the result of the idle integrity check"""
+        if problems is None:
+            self.statusBar().showMessage(
+                'Database integrity check skipped, the file is too large for an idle check. '
+                'Run "python src/cli.py check" to check it.', 10000)
+        elif problems:
+            QMessageBox.warning(
+                self, 'Database Damaged',
+                'The integrity check found problems in the database file:\n\n'
+                + '\n'.join(problems[:10])
+                + '\n\nRestore a snapshot with Tools > Restore Database.'
+            )
+        else:
+            self.statusBar().showMessage('Database integrity check passed', 5000)
+    
+    def backup_database(self):
+        """Writes a backup of the database to a chosen file"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, 'Back Up Database', 'characters-backup.db', 'Databases (*.db)'
+        )
+        if file_path:
+            self.run_backup_worker('backup', file_path)
+    
+    def restore_database(self):
+        """Replaces the database with a chosen backup"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, 'Restore Database', '', 'Databases (*.db)'
+        )
+        if not file_path:
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            'Confirmation',
+            'Restoring replaces all current characters. Continue?',
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.run_backup_worker('restore', file_path)
+    
+    def run_backup_worker(self, mode, file_path):
+        """Runs a backup or restore on a worker thread with a progress dialog"""
+        if self.backup_worker and self.backup_worker.isRunning():
+            QMessageBox.warning(self, 'Warning', 'A backup is already running!')
+            return
+        
+        title = 'Backing up database...' if mode == 'backup' else 'Restoring database...'
+        progress_dialog = QProgressDialog(title, None, 0, 100, self)
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+        
+        self.backup_worker = BackupWorker(mode, file_path, self.controller.db.db_path, parent=self)
+        self.backup_worker.progress.connect(
+            lambda copied, total: progress_dialog.setValue(copied * 100 // total if total else 100)
+        )
+        self.backup_worker.succeeded.connect(lambda path: self.backup_finished(mode, path))
+        self.backup_worker.failed.connect(
+            lambda message: QMessageBox.critical(self, 'Error', f'Backup failed: {message}')
+        )
+        self.backup_worker.finished.connect(progress_dialog.close)
+        self.backup_worker.start()
+    
+    def backup_finished(self, mode, path):
+        """Reports a finished backup or restore"""
+        if mode == 'restore':
+            # Everything cached from the old file is dropped
+            FranchiseListModel.shared(self.async_controller).reload()
+            self.gallery.gallery_model.clear_cache()
             self.load_characters()
+            self.async_controller.call('reload_name_index')
+            QThreadPool.globalInstance().start(
+                lambda: self.controller.load_similarity_index(rebuild=True))
             self.search_input.clear()
-            QMessageBox.information(self, 'Success', 'Character deleted successfully!')
+            QMessageBox.information(self, 'Success', 'Database restored successfully!\n\n'
+                                    f'The previous database was saved to {path}')
+        else:
+            QMessageBox.information(self, 'Success', f'Backup written to {path}')
@@ -0,0 +1,89 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox)
+from utils.helpers import format_size
+from utils.profiling import profiled
+
+class StatisticsDialog(QDialog):
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.init_ui()
+        self.controller.call('get_statistics', on_result=self.show_statistics,
+                             on_error=self.show_error)
+
+    @profiled()
+    def init_ui(self):
+        """Initializes the dashboard"""
+        self.setWindowTitle('Statistics')
+        self.setGeometry(200, 200, 600, 550)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        self.totals_label = QLabel('Loading...')
+        layout.addWidget(self.totals_label)
+
+        layout.addWidget(QLabel('<b>Characters per Franchise</b>'))
+        self.franchise_table = self.create_table(['Franchise', 'Characters', 'Image Size'])
+        layout.addWidget(self.franchise_table)
+
+        layout.addWidget(QLabel('<b>Characters per Creator</b>'))
+        self.creator_table = self.create_table(['Creator', 'Characters'])
+        layout.addWidget(self.creator_table)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+
+        self.rebuild_btn = QPushButton('Rebuild')
+        self.rebuild_btn.setToolTip('Recount everything if the statistics look inconsistent')
+        self.rebuild_btn.clicked.connect(self.rebuild_statistics)
+        button_layout.addWidget(self.rebuild_btn)
+
+        button_layout.addStretch()
+
+        close_btn = QPushButton('Close')
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+
+        layout.addLayout(button_layout)
+
+    def create_table(self, labels):
+        """Creates a read-only table with the given columns"""
+        table = QTableWidget()
+        table.setColumnCount(len(labels))
+        table.setHorizontalHeaderLabels(labels)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def show_statistics(self, stats):
+        """Fills the dashboard"""
+        total = stats['oc'] + stats['canon']
+        self.totals_label.setText(
+            f"<b>Characters:</b> {total} &nbsp; "
+            f"<b>OC:</b> {stats['oc']} &nbsp; <b>Canon:</b> {stats['canon']}"
+        )
+
+        self.franchise_table.setRowCount(len(stats['franchises']))
+        for row, (franchise_name, count, image_bytes) in enumerate(stats['franchises']):
+            self.franchise_table.setItem(row, 0, QTableWidgetItem(franchise_name or 'None'))
+            self.franchise_table.setItem(row, 1, QTableWidgetItem(str(count)))
+            self.franchise_table.setItem(row, 2, QTableWidgetItem(format_size(image_bytes)))
+
+        self.creator_table.setRowCount(len(stats['creators']))
+        for row, (creator, count) in enumerate(stats['creators']):
+            self.creator_table.setItem(row, 0, QTableWidgetItem(creator or 'Unknown'))
+            self.creator_table.setItem(row, 1, QTableWidgetItem(str(count)))
+
+        self.rebuild_btn.setEnabled(True)
+
+    def rebuild_statistics(self):
+        """Recomputes the summary tables in the background"""
+        self.rebuild_btn.setEnabled(False)
+        self.controller.call('rebuild_statistics', on_result=self.show_statistics,
+                             on_error=self.show_error)
+
+    def show_error(self, exception):
+        """Shows a failed database call"""
+        self.rebuild_btn.setEnabled(True)
+        QMessageBox.critical(self, 'Error', str(exception))
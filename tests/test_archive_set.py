@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models.archive_set import ArchiveSet
+from models.database import Database
+
+class ArchiveSetTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.main = self.create_archive('main.db', ['Anna', 'Joanne', 'Zoe'])
+        self.other = self.create_archive('other.db', ['ann', 'Annabel', 'Dan'])
+        self.archives = ArchiveSet(self.main)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def create_archive(self, name, character_names):
+        path = os.path.join(self.tempdir.name, name)
+        db = Database(path)
+        for character_name in character_names:
+            db.add_character(character_name, None, 1, 'me', 'info', None)
+        return path
+
+    def test_search_merges_archives_by_rank(self):
+        self.archives.attach(self.other)
+        results = [(row[0], row[2]) for row in self.archives.search_characters('ann')]
+        self.assertEqual(results, [
+            ('other', 'ann'),           # exact name
+            ('main', 'Anna'),           # name prefix
+            ('other', 'Annabel'),
+            ('main', 'Joanne'),         # name substring
+        ])
+
+    def test_attach_assigns_unique_aliases(self):
+        self.assertEqual(self.archives.attach(self.other), 'other')
+        self.assertEqual(self.archives.attach(self.other), 'other')
+
+        copy_dir = os.path.join(self.tempdir.name, 'copy')
+        os.mkdir(copy_dir)
+        copy = self.create_archive(os.path.join('copy', 'other.db'), [])
+        self.assertEqual(self.archives.attach(copy), 'other_2')
+        self.assertEqual(self.archives.attach(self.other, alias='main'), 'other')
+        self.assertEqual(self.archives.attach(copy_dir + '/../other.db', alias='temp'), 'other')
+
+        numbered = self.create_archive('2024 backup.db', [])
+        self.assertEqual(self.archives.attach(numbered), 'a_2024_backup')
+        self.assertEqual(self.archives.attach(self.create_archive('x.db', []), alias='temp'),
+                         'temp_2')
+
+    def test_missing_archive_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.archives.attach(os.path.join(self.tempdir.name, 'missing.db'))
+        self.assertEqual(self.archives.get_archives(), [('main', self.main)])
+
+    def test_main_cannot_be_detached(self):
+        with self.assertRaises(ValueError):
+            self.archives.detach('main')
+
+    def test_character_is_read_from_its_source(self):
+        alias = self.archives.attach(self.other)
+        rows = self.archives.get_all_characters()
+        self.assertEqual([row[2] for row in rows], ['Anna', 'Annabel', 'Dan', 'Joanne', 'Zoe', 'ann'])
+        source, chara_id = [(row[0], row[1]) for row in rows if row[2] == 'Dan'][0]
+        self.assertEqual(source, alias)
+        self.assertEqual(self.archives.get_character_by_id(source, chara_id)[1], 'Dan')
+
+if __name__ == '__main__':
+    unittest.main()
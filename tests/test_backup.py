@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models import backup
+from models.database import Database
+from tests.test_database import OLD_SCHEMA
+
+class BackupTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'characters.db')
+        self.backup_dir = os.path.join(self.tempdir.name, 'backups')
+        os.mkdir(self.backup_dir)
+        self.db = Database(self.path)
+        self.db.add_character('Alice', 20, 1, 'me', 'info', None, b'image')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def names(self, path):
+        return sorted(character[1] for character in Database(path).get_all_characters())
+
+    def test_backup_is_a_consistent_copy(self):
+        target = os.path.join(self.tempdir.name, 'copy.db')
+        progress = []
+        self.assertEqual(backup.backup_database(target, self.path, pages=1,
+                                                progress=lambda *step: progress.append(step)),
+                         target)
+        self.assertEqual(self.names(target), ['Alice'])
+        self.assertFalse(os.path.exists(target + '.part'))
+        self.assertEqual(progress[-1][0], progress[-1][1])
+
+    def test_snapshots_are_rotated(self):
+        for day in range(1, 6):
+            open(os.path.join(self.backup_dir, f'characters-2024010{day}-000000.db'), 'w').close()
+        open(os.path.join(self.backup_dir, 'other.db'), 'w').close()
+
+        path = backup.create_snapshot(self.path, self.backup_dir, keep=3)
+        snapshots = backup.list_snapshots(self.backup_dir)
+        self.assertEqual([os.path.basename(snapshot) for snapshot in snapshots[:2]],
+                         ['characters-20240104-000000.db', 'characters-20240105-000000.db'])
+        self.assertEqual(snapshots[2], path)
+        self.assertTrue(os.path.exists(os.path.join(self.backup_dir, 'other.db')))
+
+    def test_restore_keeps_a_snapshot_of_the_replaced_database(self):
+        source = os.path.join(self.tempdir.name, 'source.db')
+        Database(source).add_character('Bob', 30, 0, 'me', 'info', None)
+
+        snapshot = backup.restore_database(source, self.path, backup_dir=self.backup_dir)
+        self.assertEqual(self.names(self.path), ['Bob'])
+        self.assertEqual(self.names(snapshot), ['Alice'])
+
+    def test_old_backups_are_migrated_on_restore(self):
+        source = os.path.join(self.tempdir.name, 'old.db')
+        conn = sqlite3.connect(source)
+        conn.executescript(OLD_SCHEMA)
+        conn.close()
+
+        backup.restore_database(source, self.path, backup_dir=self.backup_dir)
+        conn = sqlite3.connect(self.path)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        conn.close()
+        self.assertEqual(version, len(Database.MIGRATIONS))
+        self.assertEqual(Database(self.path).get_statistics()['canon'], 1)
+
+    def test_restore_rejects_files_that_are_not_archives(self):
+        other = os.path.join(self.tempdir.name, 'other.db')
+        conn = sqlite3.connect(other)
+        conn.execute('CREATE TABLE notes (text TEXT)')
+        conn.close()
+        garbage = os.path.join(self.tempdir.name, 'garbage.db')
+        with open(garbage, 'wb') as file:
+            file.write(b'not a database' * 100)
+
+        for path in (other, garbage):
+            with self.assertRaises(ValueError):
+                backup.restore_database(path, self.path, backup_dir=self.backup_dir)
+        self.assertEqual(self.names(self.path), ['Alice'])
+        self.assertEqual(backup.list_snapshots(self.backup_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models.database import Database, DatabaseBusyError
+
+# Schema of databases created before the first migration
+OLD_SCHEMA = '''
+    CREATE TABLE franchise (
+        franchise_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        franchise_name TEXT NOT NULL UNIQUE,
+        franchise_info TEXT
+    );
+    CREATE TABLE character (
+        chara_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        chara_name TEXT NOT NULL,
+        chara_age INTEGER,
+        is_oc INTEGER NOT NULL DEFAULT 0,
+        chara_creator TEXT,
+        chara_info TEXT,
+        franchise_id INTEGER,
+        character_image BLOB,
+        FOREIGN KEY (franchise_id) REFERENCES franchise(franchise_id)
+    );
+    INSERT INTO character (chara_name, chara_info) VALUES ('Alice', 'info');
+'''
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'old.db')
+        conn = sqlite3.connect(self.path)
+        conn.executescript(OLD_SCHEMA)
+        conn.close()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def tables(self):
+        conn = sqlite3.connect(self.path)
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        conn.close()
+        return tables
+
+    def user_version(self):
+        conn = sqlite3.connect(self.path)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        conn.close()
+        return version
+
+    def test_old_database_is_migrated(self):
+        db = Database(self.path)
+        self.assertEqual(self.user_version(), len(Database.MIGRATIONS))
+        self.assertIn('sync_row', self.tables())
+        self.assertEqual(db.get_statistics()['canon'], 1)
+
+        conn = db.get_connection()
+        tracked = conn.execute("SELECT COUNT(*) FROM sync_row WHERE table_name = 'character'").fetchone()[0]
+        conn.close()
+        self.assertEqual(tracked, 1)
+
+    def test_interrupted_migration_is_rolled_back_and_retried(self):
+        migrate_change_tracking = Database.migrate_change_tracking
+
+        def interrupted(db, conn):
+            migrate_change_tracking(db, conn)
+            raise KeyboardInterrupt
+
+        with mock.patch.object(Database, 'migrate_change_tracking', interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                Database(self.path)
+
+        self.assertEqual(self.user_version(), 1)
+        self.assertNotIn('sync_row', self.tables())
+
+        db = Database(self.path)
+        self.assertEqual(self.user_version(), len(Database.MIGRATIONS))
+        self.assertEqual([row[1] for row in db.get_all_characters()], ['Alice'])
+
+class MaintenanceTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'characters.db')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def free_pages(self, db):
+        conn = db.get_connection()
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.close()
+        return free_pages
+
+    def add_and_delete_images(self, db):
+        for _ in range(20):
+            db.delete_character(db.add_character('Alice', 20, 1, 'me', 'info', None,
+                                                 os.urandom(64 * 1024)))
+
+    def test_maintenance_step_frees_pages_and_analyzes(self):
+        db = Database(self.path)
+        self.add_and_delete_images(db)
+        self.assertGreater(self.free_pages(db), 0)
+
+        self.assertGreater(db.run_maintenance_step(time_budget=5), 0)
+        self.assertEqual(self.free_pages(db), 0)
+        conn = db.get_connection()
+        analyzed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        conn.close()
+        self.assertIsNotNone(analyzed)
+
+    def test_compact_switches_old_files_to_incremental_vacuum(self):
+        conn = sqlite3.connect(self.path)
+        conn.executescript(OLD_SCHEMA)
+        conn.close()
+        db = Database(self.path)
+        self.add_and_delete_images(db)
+        self.assertTrue(db.needs_vacuum())
+
+        self.assertGreater(db.compact(), 0)
+        self.assertFalse(db.needs_vacuum())
+        self.assertEqual(self.free_pages(db), 0)
+        self.assertEqual([row[1] for row in db.get_all_characters()], ['Alice'])
+
+    def test_integrity_check_is_time_boxed(self):
+        db = Database(self.path)
+        self.assertEqual(db.check_integrity(time_budget=5), [])
+        self.assertIsNone(db.check_integrity(time_budget=0))
+
+class WriteLockTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'characters.db')
+        self.db = Database(self.path, busy_timeout=300)
+        self.other = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.other.execute('BEGIN IMMEDIATE')
+
+    def tearDown(self):
+        self.other.close()
+        self.tempdir.cleanup()
+
+    def test_busy_error_after_the_timeout(self):
+        started = time.perf_counter()
+        with self.assertRaises(DatabaseBusyError):
+            self.db.add_character('Alice', 20, 1, 'me', 'info', None)
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+        self.other.execute('ROLLBACK')
+        self.db.add_character('Alice', 20, 1, 'me', 'info', None)
+        self.assertEqual([row[1] for row in self.db.get_all_characters()], ['Alice'])
+
+    def test_write_is_retried_until_the_lock_is_released(self):
+        threading.Timer(0.1, self.other.execute, ('ROLLBACK',)).start()
+        self.db.add_character('Alice', 20, 1, 'me', 'info', None)
+        self.assertGreater(self.db.last_lock_wait, 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
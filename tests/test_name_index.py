@@ -0,0 +1,66 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models.name_index import PrefixNameIndex
+
+class PrefixNameIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(1)
+        self.index = PrefixNameIndex(limit=5)
+        # Small enough that precomputed prefixes are exercised
+        self.index.SCAN_LIMIT = 4
+        self.counts = {}
+
+    def random_name(self):
+        return ''.join(self.random.choices('abc', k=self.random.randint(1, 5))).title()
+
+    def change(self, name, delta):
+        if delta > 0:
+            self.index.add(name, delta)
+        else:
+            self.index.remove(name, -delta)
+        key = name.casefold()
+        display_name, count = self.counts.get(key, (name, 0))
+        if count + delta > 0:
+            self.counts[key] = (display_name, count + delta)
+        else:
+            self.counts.pop(key, None)
+
+    def expected(self, prefix):
+        matches = sorted((-count, key) for key, (_, count) in self.counts.items()
+                         if key.startswith(prefix.casefold()))
+        return [self.counts[key][0] for _, key in matches[:self.index.limit]]
+
+    def assert_suggestions(self):
+        for prefix in ['a', 'B', 'ab', 'abc', 'cab', 'ccc', 'abca']:
+            self.assertEqual(self.index.suggest(prefix), self.expected(prefix), prefix)
+
+    def test_build_ranks_by_frequency(self):
+        names = [(self.random_name(), self.random.randint(1, 20)) for _ in range(300)]
+        self.index.build(names)
+        for name, count in names:
+            key = name.casefold()
+            self.counts[key] = (self.counts.get(key, (name, 0))[0],
+                                self.counts.get(key, (name, 0))[1] + count)
+        self.assert_suggestions()
+
+    def test_changes_keep_suggestions_exact(self):
+        self.index.build([(self.random_name(), self.random.randint(1, 20)) for _ in range(100)])
+        for key, name, count in zip(self.index.keys, self.index.names, self.index.counts):
+            self.counts[key] = (name, count)
+
+        for _ in range(500):
+            name = self.random_name()
+            self.change(name, self.random.choice([1, 4, 30, -1, -5, -100]))
+        self.assert_suggestions()
+
+    def test_empty_prefix_suggests_nothing(self):
+        self.index.build([('Alice', 1)])
+        self.assertEqual(self.index.suggest(''), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+try:
+    import numpy as np
+    from models.similarity_index import SimilarityIndex, vectorize
+except ImportError:  # NumPy and SciPy are optional
+    SimilarityIndex = None
+
+@unittest.skipIf(SimilarityIndex is None, 'NumPy and SciPy are not installed')
+class SimilarityIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.random = random.Random(1)
+        self.words = [''.join(self.random.choices('abcdef', k=4)) for _ in range(60)]
+        self.texts = {chara_id: self.random_text() for chara_id in range(1, 201)}
+        self.index = self.new_index()
+        self.index.build(self.texts.items())
+        self.index.reweight()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def new_index(self):
+        return SimilarityIndex(os.path.join(self.tempdir.name, 'similarity.npz'))
+
+    def random_text(self):
+        return ' '.join(self.random.choices(self.words, k=self.random.randint(0, 12)))
+
+    def edit(self, count):
+        for _ in range(count):
+            chara_id = self.random.randint(1, 300)
+            if self.random.random() < 0.4:
+                self.texts.pop(chara_id, None)
+                self.index.remove(chara_id)
+            else:
+                self.texts[chara_id] = self.random_text()
+                self.index.update(chara_id, self.texts[chara_id])
+
+    def expected(self, idf, chara_id, k):
+        """Ranks all texts by brute force cosine similarity"""
+        ids = list(self.texts)
+        weighted = vectorize([self.texts[other] for other in ids]).multiply(idf).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        weighted = weighted.multiply(1 / norms[:, None]).tocsr()
+        scores = (weighted @ weighted[ids.index(chara_id)].T).toarray().ravel()
+        return sorted(((float(score), other) for other, score in zip(ids, scores)
+                       if other != chara_id and score > 0), reverse=True)[:k]
+
+    def assert_related(self, index, idf):
+        for chara_id in list(self.texts)[:40]:
+            related = index.related(chara_id, k=5)
+            expected = self.expected(idf, chara_id, 5)
+            # Ties may be ordered differently, the scores must match
+            self.assertEqual(len(related), len(expected))
+            for (_, score), (expected_score, _) in zip(related, expected):
+                self.assertAlmostEqual(score, expected_score, places=5)
+            for other, score in related:
+                self.assertIn(other, self.texts)
+
+    def test_changes_keep_the_weights_of_the_build(self):
+        idf = self.index.idf
+        self.edit(150)
+        self.assert_related(self.index, idf)
+
+    def test_changes_match_a_rebuild_after_reweighting(self):
+        # Enough deletes that flush() drops the removed rows
+        for chara_id in range(1, 151):
+            self.texts.pop(chara_id)
+            self.index.remove(chara_id)
+        self.edit(100)
+        self.index.reweight()
+
+        rebuilt = self.new_index()
+        rebuilt.build(self.texts.items())
+        rebuilt.reweight()
+        self.assertEqual(len(self.index.row_ids), len(self.texts))
+        np.testing.assert_allclose(self.index.idf, rebuilt.idf)
+        self.assert_related(self.index, rebuilt.idf)
+
+    def test_saved_index_loads_with_the_changes(self):
+        self.edit(100)
+        self.index.save()
+
+        loaded = self.new_index()
+        self.assertTrue(loaded.load())
+        loaded.reweight()
+        self.assertEqual(set(loaded.rows_by_id), set(self.texts))
+        self.assert_related(loaded, loaded.idf)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from models import sync
+from models.database import Database
+
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.a = Database(os.path.join(self.tempdir.name, 'a.db'))
+        self.b = Database(os.path.join(self.tempdir.name, 'b.db'))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def transfer(self, source, target, since=0):
+        """Applies the changes of source since a version to target, returns the new version"""
+        path = os.path.join(self.tempdir.name, 'delta.json.gz')
+        version = sync.export_changes(source, since, path)
+        sync.apply_changes(target, path)
+        return version
+
+    def tick(self):
+        # updated_at has millisecond resolution
+        time.sleep(0.01)
+
+    def names(self, db):
+        return sorted(character[1] for character in db.get_all_characters())
+
+    def franchise_names(self, db):
+        return sorted(franchise[1] for franchise in db.get_franchise_names())
+
+    def sync_ids(self, db, table):
+        conn = db.get_connection()
+        sync_ids = sorted(row[0] for row in conn.execute(
+            'SELECT sync_id FROM sync_row WHERE table_name = ?', (table,)))
+        conn.close()
+        return sync_ids
+
+    def test_new_rows_are_copied(self):
+        franchise_id = self.a.add_franchise('Saga')
+        self.a.add_character('Alice', 20, 1, 'me', 'info', franchise_id, b'image')
+        self.transfer(self.a, self.b)
+
+        character = self.b.get_character_by_id(self.b.get_character_ids()[0])
+        self.assertEqual(character[1], 'Alice')
+        self.assertEqual(character[7], 'Saga')
+        self.assertEqual(character[9], b'image')
+
+    def test_applying_twice_changes_nothing(self):
+        self.a.add_character('Alice', 20, 1, 'me', 'info', None)
+        path = os.path.join(self.tempdir.name, 'delta.json.gz')
+        sync.export_changes(self.a, 0, path)
+
+        first = sync.apply_changes(self.b, path)
+        version = sync.get_version(self.b)
+        second = sync.apply_changes(self.b, path)
+
+        self.assertEqual(first['characters'], 1)
+        self.assertEqual(second, {'franchises': 0, 'characters': 0, 'deleted': 0, 'conflicts': []})
+        self.assertEqual(sync.get_version(self.b), version)
+
+    def test_last_writer_wins(self):
+        alice = self.a.add_character('Alice', 20, 1, 'me', 'info', None)
+        self.transfer(self.a, self.b)
+        since = sync.get_version(self.b)
+
+        self.a.update_character(alice, 'Alice A', 20, 1, 'me', 'info', None)
+        self.tick()
+        self.b.update_character(self.b.get_character_ids()[0], 'Alice B', 20, 1, 'me', 'info', None)
+
+        self.transfer(self.a, self.b, since)
+        self.assertEqual(self.names(self.b), ['Alice B'])
+
+    def test_older_edit_does_not_restore_a_later_delete(self):
+        alice = self.a.add_character('Alice', 20, 1, 'me', 'info', None)
+        self.transfer(self.a, self.b)
+        since = sync.get_version(self.b)
+
+        self.b.update_character(self.b.get_character_ids()[0], 'Alice B', 20, 1, 'me', 'info', None)
+        self.tick()
+        self.a.delete_character(alice)
+
+        self.transfer(self.b, self.a, since)
+        self.assertEqual(self.names(self.a), [])
+
+        conn = self.a.get_connection()
+        tombstones = conn.execute('SELECT COUNT(*) FROM tombstone').fetchone()[0]
+        conn.close()
+        self.assertEqual(tombstones, 1)
+
+    def test_newer_edit_restores_an_older_delete(self):
+        alice = self.a.add_character('Alice', 20, 1, 'me', 'info', None)
+        self.transfer(self.a, self.b)
+        since = sync.get_version(self.b)
+
+        self.a.delete_character(alice)
+        self.tick()
+        self.b.update_character(self.b.get_character_ids()[0], 'Alice B', 20, 1, 'me', 'info', None)
+
+        self.transfer(self.b, self.a, since)
+        self.assertEqual(self.names(self.a), ['Alice B'])
+
+    def test_delete_is_applied(self):
+        alice = self.a.add_character('Alice', 20, 1, 'me', 'info', None)
+        since = self.transfer(self.a, self.b)
+
+        self.a.delete_character(alice)
+        self.transfer(self.a, self.b, since)
+        self.assertEqual(self.names(self.b), [])
+
+    def test_franchise_created_on_both_sides_is_merged(self):
+        self.a.add_character('Alice', 20, 1, 'me', 'info', self.a.add_franchise('Saga'))
+        self.b.add_character('Bob', 30, 1, 'me', 'info', self.b.add_franchise('Saga'))
+        path = os.path.join(self.tempdir.name, 'from_b.json.gz')
+        sync.export_changes(self.b, 0, path)
+
+        self.transfer(self.a, self.b)
+        sync.apply_changes(self.a, path)
+
+        for db in (self.a, self.b):
+            self.assertEqual(self.franchise_names(db), ['Saga'])
+            self.assertEqual([character[3] for character in db.get_all_characters()],
+                             ['Saga', 'Saga'])
+        self.assertEqual(self.sync_ids(self.a, 'franchise'), self.sync_ids(self.b, 'franchise'))
+
+    def test_rename_onto_a_local_name_keeps_the_local_name(self):
+        saga = self.a.add_franchise('Saga')
+        since = self.transfer(self.a, self.b)
+        self.b.add_franchise('Epic')
+
+        self.a.update_franchise(saga, 'Epic', 'info')
+        path = os.path.join(self.tempdir.name, 'delta.json.gz')
+        sync.export_changes(self.a, since, path)
+        applied = sync.apply_changes(self.b, path)
+
+        self.assertEqual(applied['conflicts'], [('Epic', 'Saga')])
+        self.assertEqual(self.franchise_names(self.b), ['Epic', 'Saga'])
+        self.assertEqual(self.b.get_all_franchises()[1][2], 'info')
+
+    def test_rename_onto_a_synced_name_keeps_the_local_name(self):
+        saga = self.a.add_franchise('Saga')
+        self.a.add_franchise('Tale')
+        since = self.transfer(self.a, self.b)
+
+        tale = [franchise[0] for franchise in self.b.get_franchise_names()
+                if franchise[1] == 'Tale'][0]
+        self.b.update_franchise(tale, 'Epic', '')
+        self.a.update_franchise(saga, 'Epic', '')
+        path = os.path.join(self.tempdir.name, 'delta.json.gz')
+        sync.export_changes(self.a, since, path)
+        applied = sync.apply_changes(self.b, path)
+
+        self.assertEqual(applied['conflicts'], [('Epic', 'Saga')])
+        self.assertEqual(self.franchise_names(self.b), ['Epic', 'Saga'])
+        # Later syncs go on normally
+        self.a.add_character('Alice', 20, 1, 'me', 'info', saga)
+        self.transfer(self.a, self.b, since)
+        self.assertEqual(self.names(self.b), ['Alice'])
+
+    def test_images_are_only_sent_when_changed(self):
+        image = os.urandom(1024 * 1024)
+        alice = self.a.add_character('Alice', 20, 1, 'me', 'info', None, image)
+        since = self.transfer(self.a, self.b)
+
+        self.a.update_character(alice, 'Alice A', 20, 1, 'me', 'info', None)
+        path = os.path.join(self.tempdir.name, 'delta.json.gz')
+        since = sync.export_changes(self.a, since, path)
+        self.assertLess(os.path.getsize(path), 10 * 1024)
+        sync.apply_changes(self.b, path)
+        character = self.b.get_character_by_id(self.b.get_character_ids()[0])
+        self.assertEqual(character[1], 'Alice A')
+        self.assertEqual(character[9], image)
+
+        new_image = os.urandom(1024)
+        self.a.update_character(alice, 'Alice A', 20, 1, 'me', 'info', None, new_image)
+        self.transfer(self.a, self.b, since)
+        self.assertEqual(self.b.get_character_image(self.b.get_character_ids()[0]), new_image)
+
+    def test_compressing_info_is_not_a_change(self):
+        self.a.add_character('Alice', 20, 1, 'me', 'info', None)
+        conn = self.a.get_connection()
+        # Long text stored uncompressed, as in databases from before compression
+        conn.execute('UPDATE character SET chara_info = ?', ('long info ' * 500,))
+        conn.commit()
+        conn.close()
+        since = sync.get_version(self.a)
+
+        self.assertEqual(self.a.compress_info()[0], 1)
+        path = os.path.join(self.tempdir.name, 'delta.json.gz')
+        sync.export_changes(self.a, since, path)
+        self.assertEqual(sync.apply_changes(self.b, path)['characters'], 0)
+        self.assertEqual(self.a.get_character_by_id(self.a.get_character_ids()[0])[5],
+                         'long info ' * 500)
+
+if __name__ == '__main__':
+    unittest.main()